@@ -69,8 +69,11 @@ SECRET_API_KEY = safe_get_secret("OPENAI_API_KEY", None)
 # IMPORT HANDLING
 # ==========================================================
 try:
-    from src.processors import classify_record_with_memory
+    from src.processors import classify_records
+    from src.llm_cache import get_llm_cache
+    from config import MAX_CONCURRENCY, EXTRACTION_MODE
     from src.validators import run_all_validations
+    from src.memory_service import get_memory_service
     IMPORTS_LOADED = True
     IMPORT_ERROR_MSG = None
 except Exception:
@@ -103,12 +106,23 @@ def log_event(msg: str, level: str = "INFO"):
 # ==========================================================
 # HELPERS
 # ==========================================================
+@st.cache_resource
+def shared_memory_service():
+    # One hot-reloading memory index per server process, shared by all sessions
+    return get_memory_service(MEMORY_PATH)
+
+
 def save_memory():
     uploaded = st.session_state.mem_uploader
     if uploaded:
         try:
-            with open(MEMORY_PATH, "wb") as f:
+            # Write-then-rename so the memory watcher never reads a half-written workbook
+            tmp_path = MEMORY_PATH + ".uploading"
+            with open(tmp_path, "wb") as f:
                 f.write(uploaded.getbuffer())
+            os.replace(tmp_path, MEMORY_PATH)
+            if IMPORTS_LOADED:
+                shared_memory_service().refresh()  # rebuilt in the background
             log_event("✅ Memory file uploaded successfully.", "SUCCESS")
             st.toast("✅ Memory loaded successfully!", icon="💾")
         except Exception as e:
@@ -224,7 +238,12 @@ with st.sidebar:
 
     st.markdown("### 🧠 Analyst Memory")
     if os.path.exists(MEMORY_PATH):
-        st.success("Memory Loaded ✅")
+        memory = shared_memory_service().snapshot() if IMPORTS_LOADED else None
+        if memory is not None and memory.examples is not None:
+            added = f", {memory.n_tail} added" if memory.n_tail else ""
+            st.success(f"Memory Loaded ✅ ({memory.n_base + memory.n_tail} examples{added})")
+        else:
+            st.success("Memory Loaded ✅")
     else:
         st.warning("Memory Missing ❌ Upload below")
 
@@ -241,6 +260,30 @@ with st.sidebar:
     DEBUG_MODE = st.toggle("🔍 Debug Mode", value=False)
     MAX_URLS = st.slider("Max URLs to scrape", 1, 200, 10)
     SCRAPE_WAIT = st.slider("Wait time per URL (sec)", 1, 15, 5)
+    AI_CONCURRENCY = st.slider("Parallel AI rows", 1, 32, MAX_CONCURRENCY)
+    AI_MODE = st.selectbox(
+        "Extraction mode",
+        ["four_call", "one_shot"],
+        index=0 if EXTRACTION_MODE == "four_call" else 1,
+        help="one_shot asks for every field in a single structured LLM call (4x fewer requests)."
+    )
+
+    USE_LLM_CACHE = True
+    if IMPORTS_LOADED:
+        llm_cache = get_llm_cache()
+        # This session only: passed to classify_records, the shared cache object is not touched
+        USE_LLM_CACHE = st.toggle("♻️ Reuse cached LLM responses", value=llm_cache.enabled, key="use_llm_cache",
+                                  disabled=not llm_cache.enabled)
+        cache_stats = llm_cache.stats()
+        st.caption(
+            f"Shared cache (all sessions): {cache_stats['entries']} entries | "
+            f"{cache_stats['hits']} hits / {cache_stats['misses']} misses"
+        )
+        confirm_clear = st.checkbox("Allow clearing the shared cache", value=False)
+        if st.button("🗑️ Clear LLM Cache (all sessions)", disabled=not confirm_clear):
+            llm_cache.clear()
+            log_event("✅ Shared LLM response cache cleared (affects all sessions).", "SUCCESS")
+            st.toast("✅ Shared LLM cache cleared", icon="🗑️")
 
     st.divider()
 
@@ -453,14 +496,24 @@ with tab_cycle:
 
                 results = []
 
-                for idx, row in df_in.iterrows():
-                    desc = str(row.get("Description of Contract", ""))
-                    c_date = str(row.get("Contract Date", ""))
+                def _update_progress(done, total):
+                    status.write(f"Processed {done}/{total}")
+                    progress_ai.progress(done / total)
 
-                    status.write(f"Processing {idx+1}/{len(df_in)}")
+                rows = [
+                    (str(row.get("Description of Contract", "")), str(row.get("Contract Date", "")), str(row.get("Header", "")))
+                    for _, row in df_in.iterrows()
+                ]
+                batch_results = classify_records(rows, max_concurrency=AI_CONCURRENCY, on_progress=_update_progress, mode=AI_MODE,
+                                                 use_cache=USE_LLM_CACHE)
+
+                for idx, ((_, row), res) in enumerate(zip(df_in.iterrows(), batch_results)):
+                    desc = rows[idx][0]
 
                     try:
-                        res = classify_record_with_memory(desc, c_date)
+                        if "__error__" in res:
+                            raise RuntimeError(res["__error__"])
+
                         res = run_all_validations(res, desc)
 
                         row_dict = row.to_dict()
@@ -490,8 +543,6 @@ with tab_cycle:
                             "Reported Date (By SGA)": datetime.datetime.now().strftime("%Y-%m-%d")
                         })
 
-                    progress_ai.progress((idx + 1) / len(df_in))
-
                 df_out = pd.DataFrame(results)
                 df_out.columns = df_out.columns.str.strip()
 
@@ -577,6 +628,21 @@ with tab_dashboard:
             height=520
         )
 
+        if IMPORTS_LOADED and st.button("🧠 Add reviewed rows to Analyst Memory"):
+            # Shared by every session; journaled so the rows survive restarts
+            edited_hash = int(pd.util.hash_pandas_object(edited.astype(str), index=False).sum())
+            if st.session_state.get("memory_added_hash") == edited_hash:
+                added = 0
+                st.info("These rows are already in the memory.")
+            else:
+                added = shared_memory_service().add_contracts(edited.to_dict("records"))
+            if added:
+                st.session_state.memory_added_hash = edited_hash
+                log_event(f"🧠 Added {added} reviewed rows to the analyst memory.", "SUCCESS")
+                st.toast(f"🧠 {added} rows added to memory", icon="💾")
+            elif st.session_state.get("memory_added_hash") != edited_hash:
+                st.warning("Nothing added (memory not loaded or no descriptions).")
+
         st.divider()
         st.subheader("📥 Export")
 
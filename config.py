@@ -7,6 +7,7 @@ import os
 INPUT_FILE = "data/scraped_raw_data.csv" 
 OUTPUT_FILE = "Processed_Contracts_Output_V2_RAG.xlsx"
 DB_PERSIST_DIR = "./db_storage"
+CHROMA_COLLECTION_NAME = "defense_contracts_memory"  # legacy embedded memory in DB_PERSIST_DIR (read-only)
 
 # COLUMN MAPPING
 COL_DESC = "Description of Contract"
@@ -18,5 +19,90 @@ MODEL_NAME = "gpt-4o-mini"
 EMBEDDING_MODEL = "text-embedding-3-small"  
 BASE_URL = "https://llmfoundry.straive.com/openai/v1/"
 
+# LLM HTTP CLIENT (one pooled keep-alive client per base_url/key)
+LLM_TIMEOUT_SECONDS = 60
+LLM_CONNECT_TIMEOUT_SECONDS = 10
+LLM_MAX_CONNECTIONS = 64
+LLM_MAX_KEEPALIVE_CONNECTIONS = 32
+LLM_KEEPALIVE_EXPIRY_SECONDS = 120
+
+# LLM RATE LIMITS (starting budget; refined from x-ratelimit-* response headers)
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 200000
+LLM_MAX_RETRIES = 5
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 60.0
+
+# BATCH PROCESSING
+MAX_CONCURRENCY = 8  # rows classified in parallel
+EXTRACTION_MODE = "four_call"  # "four_call" (one prompt per field group) or "one_shot" (single consolidated prompt)
+
+# SUPPLIER SHORTLIST (taxonomy names injected into FINANCIAL_PROMPT per row)
+SUPPLIER_SHORTLIST_SIZE = 15
+
+# PERSISTED TF-IDF MEMORY INDEX (one sub-folder per memory workbook hash)
+MEMORY_INDEX_DIR = "memory_index"
+MEMORY_WAL_PATH = "memory_additions.jsonl"  # write-ahead log of contracts added at runtime
+MEMORY_WAL_ARCHIVE_PATH = "memory_additions.folded.jsonl"  # log entries already folded into a checkpoint
+MEMORY_REWEIGHT_EVERY = 200  # background vocabulary/IDF refit after this many additions
+MEMORY_WATCH_SECONDS = 2  # how often the memory workbook is checked for changes (0 = never)
+
+# COMPILED TAXONOMY (parsed TAXONOMY_STR tables, one file per taxonomy hash)
+TAXONOMY_CACHE_DIR = "taxonomy_cache"
+
+# PROMPT RENDERING of the reference data (see src/prompt_rendering.py)
+# Stays "verbose" until `python -m src.evaluation rendering <file>` shows accuracy parity for the shorter formats
+PROMPT_TAXONOMY_FORMAT = os.environ.get("PROMPT_TAXONOMY_FORMAT", "verbose")  # "verbose", "names" or "compact"
+PROMPT_GEOGRAPHY_FORMAT = os.environ.get("PROMPT_GEOGRAPHY_FORMAT", "verbose")  # "verbose" or "compact"
+
+# MEMORY SEARCH BACKEND ("exact", "ivf", "hnsw" or "auto" = exact below MEMORY_ANN_MIN_ROWS)
+# Exact by default: on `python -m src.evaluation ann` (50k rows) IVF recall@3 at n_probe 8 is
+# 0.81 with refine 128 and still 0.94 with refine 1024, so opt in to "ivf"/"auto" knowingly
+MEMORY_INDEX_BACKEND = os.environ.get("MEMORY_INDEX_BACKEND", "exact")
+MEMORY_ANN_MIN_ROWS = 20000
+IVF_N_COMPONENTS = 128  # dense projection size for the ANN coarse search
+IVF_N_PROBE = 8  # inverted lists scanned per query (recall vs latency)
+IVF_REFINE = 128  # dense-ranked candidates re-scored exactly per query
+
+# CROSS-ENCODER RE-RANKING of memory hits (needs torch + transformers + weights in RERANKER_MODEL_DIR)
+RERANK_ENABLED = os.environ.get("RERANK_ENABLED", "0") == "1"
+RERANKER_MODEL_DIR = "model"
+RERANK_CANDIDATES = 10  # TF-IDF hits re-scored per query
+RERANK_BATCH_TOKENS = 4096  # padded tokens per inference batch
+RERANK_MAX_BATCH = 32
+RERANK_MAX_LENGTH = 256
+RERANK_THREADS = 2
+RERANK_QUANTIZE = True  # dynamic int8 Linear layers
+
+# K-SHOT EXAMPLE RETRIEVAL (analyst memory examples injected into the prompts)
+SIMILAR_EXAMPLES_K = 3
+SIMILAR_EXAMPLES_TOKEN_BUDGET = 260  # all injected examples together (~2 excerpts)
+SIMILAR_EXAMPLE_CHARS = 300  # excerpt length per example
+SIMILAR_EXAMPLES_MIN_SCORE = 0.1
+SIMILAR_EXAMPLES_MMR_LAMBDA = 0.7  # 1.0 = pure relevance, lower = more diverse
+SIMILAR_EXAMPLES_DUPLICATE_SIM = 0.9  # examples this similar to a picked one are dropped
+
+# NEAR-DUPLICATE DEDUP (one LLM classification per cluster of re-published paragraphs)
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.9  # estimated Jaccard over word shingles (money/ids/numbers masked)
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16  # LSH bands (DEDUP_NUM_PERM / DEDUP_BANDS rows each)
+DEDUP_SHINGLE_WORDS = 3
+
+# RULE PRE-CLASSIFIER (regex fields at/above the threshold skip or override the LLM)
+RULE_PRECLASSIFIER_ENABLED = True
+RULE_CONFIDENCE_THRESHOLD = 0.9
+
+# OFFLINE BATCH JOBS (nightly backfills via the /v1/batches endpoint)
+BATCH_WORK_DIR = "batch_jobs"
+BATCH_POLL_SECONDS = 30
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_MAX_REQUESTS_PER_FILE = 50000
+
+# LLM RESPONSE CACHE (set LLM_CACHE_ENABLED=0 to bypass)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_PATH = "llm_cache.sqlite3"
+LLM_CACHE_MAX_MB = 256
+
 # NOTE: We removed getpass() and API_KEY_FORMATTED from here.
 # We will construct the key in the main app instead.
\ No newline at end of file
@@ -22,8 +22,8 @@ from selenium.webdriver.common.by import By
 
 # RAG / Custom Module Imports
 try:
-    from src.vector_engine import DefenseVectorDB
-    from src.processors import classify_full_record_rag
+    from src.processors import classify_records
+    from src.batch_jobs import run_batch_job
     from src.validators import run_all_validations 
 except ImportError as e:
     print(f"WARNING: Could not import 'src' modules ({e}). RAG step will fail if attempted.")
@@ -204,12 +204,13 @@ def run_scraper():
     print(f"\nSUCCESS: Saved {len(scraped_df)} records to '{INTERMEDIATE_CSV}'")
     return True
 
-def run_rag_processor():
+def run_rag_processor(offline_batch=False):
+    """
+    offline_batch=True submits every prompt through the provider's batch
+    endpoint instead of live calls (slower turnaround, cheaper for backfills).
+    """
     print("\n--- [STEP 2/2] STARTING RAG PROCESSOR ---")
     
-    # Initialize Vector Engine
-    rag_db = DefenseVectorDB(persist_dir=DB_PERSIST_DIR)
-
     if not os.path.exists(INTERMEDIATE_CSV):
         print(f"Error: {INTERMEDIATE_CSV} missing.")
         return
@@ -217,18 +218,26 @@ def run_rag_processor():
     df = pd.read_csv(INTERMEDIATE_CSV, encoding='utf-8')
     results = []
 
-    for idx, row in df.iterrows():
-        print(f"Processing row {idx + 1}/{len(df)}...")
-        
-        desc = str(row.get("Description of Contract", ""))
-        c_date = str(row.get("Contract Date", ""))
-        
+    # 1. Run RAG Classification for the whole batch (bounded concurrency, input order kept)
+    rows = [
+        (str(row.get("Description of Contract", "")), str(row.get("Contract Date", "")), str(row.get("Header", "")))
+        for _, row in df.iterrows()
+    ]
+    if offline_batch:
+        batch_results = run_batch_job(rows)
+    else:
+        batch_results = classify_records(
+            rows,
+            on_progress=lambda done, total: print(f"Processed row {done}/{total}...")
+        )
+
+    for (idx, row), (desc, c_date, _), res in zip(df.iterrows(), rows, batch_results):
         # Check if Scraper flagged this as Multiple
         pre_supplier = str(row.get("Supplier Name", ""))
         
         try:
-            # 1. Run RAG Classification
-            res = classify_full_record_rag(desc, c_date, rag_db)
+            if "__error__" in res:
+                raise RuntimeError(res["__error__"])
             
             # 2. Run Validation Logic
             try:
@@ -281,6 +290,7 @@ def run_rag_processor():
 
 if __name__ == "__main__":
     # Execute full pipeline
+    # Pass --batch to classify through the offline batch endpoint (nightly backfills)
     if run_scraper():
         time.sleep(2) # Brief pause to ensure file release
-        run_rag_processor()
\ No newline at end of file
+        run_rag_processor(offline_batch="--batch" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Pluggable nearest-neighbour indexes over the TF-IDF memory matrix.
+
+- ExactSparseIndex: brute-force cosine (one sparse product), the reference.
+- IVFIndex: TruncatedSVD projection to a small dense space, k-means coarse
+  quantizer and inverted lists. A query scans only the `n_probe` closest
+  lists on the dense projection, then re-scores the best few exactly on the
+  sparse vectors, so returned scores are true cosines and thresholds keep
+  their meaning.
+- HNSWIndex: hnswlib graph over the same dense projection (only when hnswlib
+  is installed), also re-scored exactly.
+
+Every index returns the memory_index.SIMILAR_MATCH_DTYPE (n, k) layout.
+"""
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from config import MEMORY_INDEX_BACKEND, MEMORY_ANN_MIN_ROWS, IVF_N_COMPONENTS, IVF_N_PROBE, IVF_REFINE
+from src.memory_index import SIMILAR_MATCH_DTYPE, top_k_similar
+
+try:
+    import hnswlib
+except ImportError:  # optional
+    hnswlib = None
+
+
+class ExactSparseIndex:
+    kind = "exact"
+
+    def __init__(self, example_vectors):
+        self.example_vectors = sp.csr_matrix(example_vectors)
+
+    def __len__(self):
+        return self.example_vectors.shape[0]
+
+    def search(self, query_vectors, k: int = 1) -> np.ndarray:
+        return top_k_similar(query_vectors, self.example_vectors, k)
+
+
+class _ProjectedIndex:
+    """
+    Shared parts of the dense-projection indexes: the SVD projection and exact
+    sparse re-scoring of each query's candidate rows.
+    """
+
+    def __init__(self, example_vectors, n_components: int = IVF_N_COMPONENTS, random_state: int = 0):
+        self.example_vectors = sp.csr_matrix(example_vectors)
+        n_rows, n_terms = self.example_vectors.shape
+        n_components = max(1, min(n_components, n_terms - 1, n_rows - 1))
+
+        self.svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+        self.dense = normalize(self.svd.fit_transform(self.example_vectors)).astype(np.float32)
+
+    def __len__(self):
+        return self.example_vectors.shape[0]
+
+    def project(self, query_vectors) -> np.ndarray:
+        return normalize(self.svd.transform(query_vectors)).astype(np.float32)
+
+    def _rescore(self, query_vectors, candidates: list, k: int) -> np.ndarray:
+        """
+        Exact cosine for every (query, candidate) pair in one sparse pass, then
+        a per-query top-k over its candidate segment.
+        """
+        matches = np.zeros((query_vectors.shape[0], k), dtype=SIMILAR_MATCH_DTYPE)
+        matches["example_idx"] = -1
+        sizes = np.array([len(c) for c in candidates], dtype=np.int64)
+        if sizes.sum() == 0:
+            return matches
+
+        rows = np.concatenate(candidates).astype(np.int64)
+        owners = np.repeat(np.arange(len(candidates)), sizes)
+        queries = sp.csr_matrix(query_vectors)
+        scores = np.asarray(self.example_vectors[rows].multiply(queries[owners]).sum(axis=1)).ravel()
+
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        for q in np.flatnonzero(sizes):
+            seg = scores[offsets[q]:offsets[q + 1]]
+            take = min(k, len(seg))
+            top = np.argpartition(-seg, take - 1)[:take] if take < len(seg) else np.arange(len(seg))
+            top = top[np.argsort(-seg[top], kind="stable")]
+            matches[q, :take]["example_idx"] = rows[offsets[q] + top]
+            matches[q, :take]["score"] = seg[top]
+        return matches
+
+
+class IVFIndex(_ProjectedIndex):
+    kind = "ivf"
+
+    def __init__(self, example_vectors, n_components: int = IVF_N_COMPONENTS, n_lists: int = None,
+                 n_probe: int = IVF_N_PROBE, refine: int = IVF_REFINE, random_state: int = 0):
+        super().__init__(example_vectors, n_components, random_state)
+        n_rows = len(self)
+        self.n_lists = max(1, min(n_lists or int(np.sqrt(n_rows)), n_rows))
+        self.n_probe = n_probe
+        self.refine = refine
+
+        kmeans = MiniBatchKMeans(n_clusters=self.n_lists, random_state=random_state, n_init=3,
+                                 batch_size=max(1024, 4 * self.n_lists))
+        assignments = kmeans.fit_predict(self.dense)
+        self.centroids = normalize(kmeans.cluster_centers_).astype(np.float32)
+
+        # Inverted lists as one sorted row array + offsets (CSR-style)
+        self.list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        self.list_offsets = np.searchsorted(assignments[self.list_rows], np.arange(self.n_lists + 1))
+
+    def search(self, query_vectors, k: int = 1, n_probe: int = None) -> np.ndarray:
+        n_probe = max(1, min(n_probe or self.n_probe, self.n_lists))
+        projected = self.project(query_vectors)
+        centroid_scores = projected @ self.centroids.T
+        if n_probe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), centroid_scores.shape)
+
+        # Rank each query's probed rows on the dense projection; only the best
+        # `refine` (at least k) go on to exact sparse scoring
+        fetch = max(k, self.refine)
+        candidates = []
+        for q, row in enumerate(probes):
+            cand = np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in row])
+            if len(cand) > fetch:
+                approx = self.dense[cand] @ projected[q]
+                cand = cand[np.argpartition(-approx, fetch - 1)[:fetch]]
+            candidates.append(cand)
+        return self._rescore(query_vectors, candidates, k)
+
+
+class HNSWIndex(_ProjectedIndex):
+    kind = "hnsw"
+
+    def __init__(self, example_vectors, n_components: int = IVF_N_COMPONENTS, ef: int = 64,
+                 m: int = 16, random_state: int = 0):
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed")
+        super().__init__(example_vectors, n_components, random_state)
+        self.ef = ef
+        self.graph = hnswlib.Index(space="ip", dim=self.dense.shape[1])
+        self.graph.init_index(max_elements=len(self), ef_construction=max(ef, 100), M=m, random_seed=random_state)
+        self.graph.add_items(self.dense, np.arange(len(self)))
+
+    def search(self, query_vectors, k: int = 1, ef: int = None) -> np.ndarray:
+        fetch = min(len(self), max(k * 4, k))
+        self.graph.set_ef(max(ef or self.ef, fetch))
+        labels, _ = self.graph.knn_query(self.project(query_vectors), k=fetch)
+        return self._rescore(query_vectors, [row.astype(np.int64) for row in labels], k)
+
+
+INDEX_BACKENDS = {
+    "exact": ExactSparseIndex,
+    "ivf": IVFIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+def build_index(example_vectors, backend: str = MEMORY_INDEX_BACKEND):
+    """
+    Index for a memory matrix. "auto" stays exact below MEMORY_ANN_MIN_ROWS
+    rows (brute force is faster there) and uses IVF above it; an unavailable
+    backend falls back to exact.
+    """
+    if backend == "auto":
+        backend = "ivf" if example_vectors.shape[0] >= MEMORY_ANN_MIN_ROWS else "exact"
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown index backend '{backend}'. Choose from {list(INDEX_BACKENDS)} or 'auto'")
+
+    try:
+        return INDEX_BACKENDS[backend](example_vectors)
+    except ImportError as e:
+        print(f"⚠️ Index backend '{backend}' unavailable ({e}); using exact search")
+        return ExactSparseIndex(example_vectors)
@@ -0,0 +1,254 @@
+"""
+Offline batch-job mode for large backfills.
+
+Every prompt classify_record_with_memory would send is written to a JSONL
+batch file, submitted to the OpenAI-compatible /v1/batches endpoint, polled
+until done and mapped back to its row by a stable custom_id. Domestic Content
+depends on the Geography answer, so four-call mode runs as two batch phases.
+"""
+import hashlib
+import json
+import os
+import time
+
+from config import (
+    MODEL_NAME, BASE_URL, BATCH_WORK_DIR, BATCH_POLL_SECONDS,
+    BATCH_COMPLETION_WINDOW, BATCH_MAX_REQUESTS_PER_FILE
+)
+from src.llm_cache import get_llm_cache
+from src.llm_client import get_client
+from src.processors import (
+    build_taxonomy_request, build_geography_request, build_domestic_request,
+    build_financial_request, build_consolidated_request,
+    finalize_domestic, finalize_financial, merge_record_results, domestic_is_forced, resolve_supplier_column,
+    split_consolidated_result, get_similar_case_sets,
+    JSON_OBJECT_FORMAT, CONSOLIDATED_RESPONSE_FORMAT,
+    GEOGRAPHY_KEYS, FINANCIAL_KEYS
+)
+from src.rule_extractor import pre_classify, confident_fields
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def make_request_id(row_idx: int, description: str, contract_date_str: str, stage: str) -> str:
+    """
+    Stable custom_id: row position + content fingerprint + stage name.
+    """
+    digest = hashlib.sha1(f"{description}\x1f{contract_date_str}".encode("utf-8")).hexdigest()[:12]
+    return f"row-{row_idx:06d}-{digest}:{stage}"
+
+
+def _batch_line(custom_id: str, prompt_text: str, system_message: str, response_format: dict) -> dict:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt_text}
+            ],
+            "temperature": 0,
+            "response_format": response_format
+        }
+    }
+
+
+def write_batch_files(lines: list, work_dir: str, prefix: str) -> list:
+    """
+    Writes request lines as one or more JSONL files (split at BATCH_MAX_REQUESTS_PER_FILE).
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    paths = []
+    for part, start in enumerate(range(0, len(lines), BATCH_MAX_REQUESTS_PER_FILE)):
+        path = os.path.join(work_dir, f"{prefix}_{part:03d}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines[start:start + BATCH_MAX_REQUESTS_PER_FILE]:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        paths.append(path)
+    return paths
+
+
+def submit_batch_file(client, path: str):
+    with open(path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW
+    )
+    print(f"📤 Submitted {os.path.basename(path)} as batch {batch.id}")
+    return batch
+
+
+def wait_for_batch(client, batch_id: str, poll_seconds: float = BATCH_POLL_SECONDS):
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            print(f"📥 Batch {batch_id} finished with status '{batch.status}'")
+            return batch
+        time.sleep(poll_seconds)
+
+
+def _item_error(item: dict) -> str:
+    error = item.get("error") or {}
+    response = item.get("response") or {}
+    message = error.get("message") if isinstance(error, dict) else str(error)
+    return message or f"HTTP {response.get('status_code', '?')}"
+
+
+def download_batch_results(client, batch) -> dict:
+    """
+    custom_id -> parsed JSON answer, or {"__error__": reason} for a request
+    that failed (output or error file) or whose answer cannot be parsed.
+    Requests missing from both files are handled by run_batch_phase.
+    """
+    results = {}
+    if batch.status != "completed":
+        print(f"⚠️ Batch {batch.id} ended as '{batch.status}'; unanswered requests will be marked as errors")
+
+    for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+        if not file_id:
+            continue
+        content = client.files.content(file_id).text
+        for raw_line in content.splitlines():
+            if not raw_line.strip():
+                continue
+            item = json.loads(raw_line)
+            custom_id = item.get("custom_id")
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                results[custom_id] = {"__error__": f"Batch request failed: {_item_error(item)}"}
+                continue
+            try:
+                message = response["body"]["choices"][0]["message"]["content"]
+                answer = json.loads(message) if message else {}
+                if not isinstance(answer, dict):
+                    raise ValueError("answer is not a JSON object")
+                results[custom_id] = answer
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                print(f"⚠️ Could not parse batch answer for {custom_id}: {e}")
+                results[custom_id] = {"__error__": f"Unparsable batch answer: {e}"}
+    return results
+
+
+def run_batch_phase(client, requests: dict, work_dir: str, phase: str, poll_seconds: float) -> dict:
+    """
+    Submits `requests` (custom_id -> (prompt, system, response_format)) and returns
+    custom_id -> answer. Every request gets an entry: failed, expired or
+    missing requests come back as {"__error__": reason}. Successful answers
+    are also stored in the LLM cache so a later interactive run over the same
+    rows costs no network calls.
+    """
+    if not requests:
+        return {}
+
+    lines = [_batch_line(cid, *req) for cid, req in requests.items()]
+    batches = [submit_batch_file(client, path) for path in write_batch_files(lines, work_dir, phase)]
+
+    answers, statuses = {}, []
+    for batch in batches:
+        batch = wait_for_batch(client, batch.id, poll_seconds)
+        statuses.append(f"{batch.id}: {batch.status}")
+        answers.update(download_batch_results(client, batch))
+
+    for cid in requests:
+        if cid not in answers:
+            answers[cid] = {"__error__": f"No batch result ({', '.join(statuses)})"}
+
+    cache = get_llm_cache()
+    for cid, answer in answers.items():
+        if answer and "__error__" not in answer and cid in requests:
+            prompt_text, system_message, response_format = requests[cid]
+            cache.put(cache.make_key(MODEL_NAME, system_message, prompt_text, response_format), answer)
+
+    return answers
+
+
+def run_batch_job(rows, mode: str = "four_call", work_dir: str = BATCH_WORK_DIR, base_url: str = BASE_URL,
+                  api_key: str = None, poll_seconds: float = BATCH_POLL_SECONDS) -> list:
+    """
+    Batch equivalent of processors.classify_records: `rows` is a list of
+    (description, contract_date_str[, header]) tuples, results come back in
+    input order with the same keys. Rows whose geography the rule
+    pre-classifier already knows send no Geography / Domestic Content request.
+    A row with any failed, expired or unanswered request comes back as
+    {"__error__": reason}, like a failed row in classify_records.
+    Point `base_url` at a local stand-in server (src/batch_stub_server.py) for testing.
+    """
+    rows_in = list(rows)
+    rows = [(row[0], row[1]) for row in rows_in]
+    rules = [pre_classify(row[0], row[2] if len(row) > 2 else "") for row in rows_in]
+    client = get_client(base_url, api_key)
+
+    ids = [
+        {stage: make_request_id(i, desc, c_date, stage) for stage in ("taxonomy", "geography", "domestic", "financial", "one_shot")}
+        for i, (desc, c_date) in enumerate(rows)
+    ]
+
+    # --- PHASE 1: prompts with no dependencies ---
+    phase_one = {}
+    case_sets = get_similar_case_sets(desc for desc, _ in rows)
+    for (desc, _), rid, row_rules, similar_cases in zip(rows, ids, rules, case_sets):
+        if mode == "one_shot":
+            phase_one[rid["one_shot"]] = (*build_consolidated_request(desc, similar_cases), CONSOLIDATED_RESPONSE_FORMAT)
+        else:
+            phase_one[rid["taxonomy"]] = (*build_taxonomy_request(desc, similar_cases), JSON_OBJECT_FORMAT)
+            if len(confident_fields(row_rules, GEOGRAPHY_KEYS)) < len(GEOGRAPHY_KEYS):
+                phase_one[rid["geography"]] = (*build_geography_request(desc), JSON_OBJECT_FORMAT)
+            phase_one[rid["financial"]] = (*build_financial_request(desc), JSON_OBJECT_FORMAT)
+
+    answers = run_batch_phase(client, phase_one, work_dir, f"{mode}_phase1", poll_seconds)
+
+    def answer(cid: str) -> dict:
+        found = answers.get(cid, {})
+        return {} if "__error__" in found else found
+
+    def row_error(rid: dict):
+        errors = [f"{stage}: {answers[cid]['__error__']}" for stage, cid in rid.items()
+                  if "__error__" in answers.get(cid, {})]
+        return "; ".join(errors) if errors else None
+
+    geo_results = [
+        {**answer(rid["geography"]), **confident_fields(row_rules, GEOGRAPHY_KEYS)}
+        for rid, row_rules in zip(ids, rules)
+    ]
+
+    # --- PHASE 2: Domestic Content needs the Geography answer ---
+    if mode != "one_shot":
+        phase_two = {
+            rid["domestic"]: (*build_domestic_request(desc, geo_result), JSON_OBJECT_FORMAT)
+            for (desc, _), rid, geo_result in zip(rows, ids, geo_results)
+            if not domestic_is_forced(geo_result) and row_error(rid) is None
+        }
+        answers.update(run_batch_phase(client, phase_two, work_dir, f"{mode}_phase2", poll_seconds))
+
+    # --- MAP BACK TO ROWS ---
+    results = []
+    for (desc, c_date), rid, row_rules, geo_result in zip(rows, ids, rules, geo_results):
+        error = row_error(rid)
+        if error:
+            print(f"❌ Batch row {rid['taxonomy'].split(':')[0]} failed: {error}")
+            results.append({"__error__": error})
+            continue
+        try:
+            if mode == "one_shot":
+                class_result, geo_result, dom_result, fin_result = split_consolidated_result(
+                    {**answer(rid["one_shot"]), **confident_fields(row_rules)}, resolve_supplier=False
+                )
+            else:
+                class_result = answer(rid["taxonomy"])
+                dom_result = finalize_domestic(answer(rid["domestic"]), geo_result)
+                fin_result = finalize_financial(
+                    {**answer(rid["financial"]), **confident_fields(row_rules, FINANCIAL_KEYS)},
+                    resolve_supplier=False
+                )
+
+            results.append(merge_record_results(class_result, geo_result, dom_result, fin_result, desc, c_date))
+        except Exception as e:
+            print(f"❌ Batch row {rid['taxonomy'].split(':')[0]} failed: {e}")
+            results.append({"__error__": str(e)})
+
+    return resolve_supplier_column(results)
@@ -0,0 +1,169 @@
+"""
+Local stand-in for the OpenAI Files + Batches API, for exercising
+src/batch_jobs.py without a real provider.
+
+Usage:
+    python -m src.batch_stub_server --port 8765
+    # then run_batch_job(rows, base_url="http://127.0.0.1:8765/v1", api_key="stub")
+
+Batches complete immediately. Each request is answered by `responder(body)`,
+which receives the chat-completions body and returns the JSON answer dict
+(the default answers {} for every prompt).
+"""
+import argparse
+import email.parser
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _empty_responder(body: dict) -> dict:
+    return {}
+
+
+class BatchStubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, responder=_empty_responder):
+        self.responder = responder
+        self.files = {}
+        self.batches = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # ---------- storage ----------
+    def _store_file(self, filename: str, data: bytes, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        record = {
+            "id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed"
+        }
+        with self._lock:
+            self.files[file_id] = (record, data)
+        return record
+
+    def _run_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> dict:
+        _, data = self.files[input_file_id]
+        output_lines, total, failed = [], 0, 0
+
+        for raw_line in data.decode("utf-8").splitlines():
+            if not raw_line.strip():
+                continue
+            total += 1
+            item = json.loads(raw_line)
+            try:
+                answer = self.responder(item["body"])
+                response = {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "model": item["body"].get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": json.dumps(answer)}
+                        }]
+                    }
+                }
+                output_lines.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": item["custom_id"], "response": response, "error": None})
+            except Exception as e:
+                failed += 1
+                output_lines.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": item.get("custom_id"), "response": None, "error": {"message": str(e)}})
+
+        output = "\n".join(json.dumps(line) for line in output_lines).encode("utf-8")
+        output_file = self._store_file("batch_output.jsonl", output, "batch_output")
+
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}", "object": "batch", "endpoint": endpoint,
+            "input_file_id": input_file_id, "completion_window": completion_window,
+            "status": "completed", "output_file_id": output_file["id"], "error_file_id": None,
+            "created_at": now, "completed_at": now,
+            "request_counts": {"total": total, "completed": total - failed, "failed": failed}
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    # ---------- HTTP ----------
+    def _make_handler(server):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if self.path.endswith("/files"):
+                    message = email.parser.BytesParser().parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + data
+                    )
+                    fields = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+                    file_part = fields["file"]
+                    purpose = fields["purpose"].get_payload(decode=True).decode("utf-8") if "purpose" in fields else "batch"
+                    record = server._store_file(file_part.get_filename() or "upload.jsonl", file_part.get_payload(decode=True), purpose)
+                    return self._send_json(record)
+
+                if self.path.endswith("/batches"):
+                    params = json.loads(data or b"{}")
+                    if params.get("input_file_id") not in server.files:
+                        return self._send_json({"error": {"message": "input file not found"}}, 404)
+                    return self._send_json(server._run_batch(
+                        params["input_file_id"], params.get("endpoint"), params.get("completion_window", "24h")
+                    ))
+
+                self._send_json({"error": {"message": f"Unknown endpoint {self.path}"}}, 404)
+
+            def do_GET(self):
+                batch_match = re.search(r"/batches/([^/]+)$", self.path)
+                if batch_match and batch_match.group(1) in server.batches:
+                    return self._send_json(server.batches[batch_match.group(1)])
+
+                content_match = re.search(r"/files/([^/]+)/content$", self.path)
+                if content_match and content_match.group(1) in server.files:
+                    _, data = server.files[content_match.group(1)]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+
+                self._send_json({"error": {"message": f"Not found: {self.path}"}}, 404)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Local OpenAI Files/Batches stand-in")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    args = arg_parser.parse_args()
+
+    stub = BatchStubServer(args.host, args.port)
+    print(f"🧪 Batch stub listening on {stub.base_url}")
+    stub._httpd.serve_forever()
@@ -0,0 +1,242 @@
+"""
+Read-only access to the persisted Chroma collection in DB_PERSIST_DIR.
+
+The original memory engine embedded contracts with the OpenAI embedding model
+into Chroma. Those vectors are still on disk, so they can be searched without
+the chromadb package and without re-embedding anything:
+
+- chroma.sqlite3 holds documents/metadata (metadata segment tables) and the
+  embeddings write-ahead queue (`embeddings_queue`), where vectors live until
+  Chroma flushes them into the HNSW segment.
+- <vector segment id>/ holds the hnswlib binaries (header.bin, data_level0.bin)
+  for vectors already flushed; index_metadata.pickle maps hnswlib labels back
+  to embedding ids. It pickles a chromadb class, so it is read with a
+  restricted unpickler that maps chromadb classes to a plain attribute holder
+  (chromadb is not needed, and nothing else can be instantiated).
+
+Vectors are loaded in bulk into one float32 matrix and searched exactly (the
+collection is small; a query is one matrix-vector product). The query vector
+is supplied by the caller, e.g. from the same embedding model computed locally.
+"""
+import os
+import pickle
+import sqlite3
+import struct
+from contextlib import closing
+
+import numpy as np
+
+from config import DB_PERSIST_DIR, CHROMA_COLLECTION_NAME
+
+# embeddings_queue.operation codes
+OP_ADD, OP_UPDATE, OP_UPSERT, OP_DELETE = 0, 1, 2, 3
+
+DOCUMENT_KEY = "chroma:document"
+
+# hnswlib (Chroma fork) header.bin: persist version, then hnswlib's HierarchicalNSW fields
+_HNSW_HEADER = struct.Struct("<iQQQQQQiiQQQdQ")
+_HNSW_HEADER_FIELDS = (
+    "version", "offset_level0", "max_elements", "cur_element_count", "size_data_per_element",
+    "label_offset", "offset_data", "max_level", "enterpoint_node", "max_m", "max_m0", "m",
+    "mult", "ef_construction"
+)
+
+
+def read_hnsw_segment(segment_dir: str, dim: int) -> tuple:
+    """
+    (labels, vectors) stored in an hnswlib persisted segment, in element order.
+    Returns empty arrays when the segment has no flushed elements.
+    """
+    with open(os.path.join(segment_dir, "header.bin"), "rb") as f:
+        header = dict(zip(_HNSW_HEADER_FIELDS, _HNSW_HEADER.unpack(f.read(_HNSW_HEADER.size))))
+
+    count = header["cur_element_count"]
+    if count == 0:
+        return np.empty(0, dtype=np.uint64), np.empty((0, dim), dtype=np.float32)
+
+    # Each level-0 record: [link list][vector: dim float32][label: uint64]
+    record = np.dtype({
+        "names": ["vector", "label"],
+        "formats": [(np.float32, dim), np.uint64],
+        "offsets": [header["offset_data"], header["label_offset"]],
+        "itemsize": header["size_data_per_element"],
+    })
+    elements = np.fromfile(os.path.join(segment_dir, "data_level0.bin"), dtype=record, count=count)
+    return elements["label"].copy(), np.ascontiguousarray(elements["vector"])
+
+
+class _PickledState:
+    """
+    Stand-in for a pickled chromadb object: keeps its attributes, nothing else.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):  # (__dict__, __slots__ values)
+            state = {k: v for part in state if isinstance(part, dict) for k, v in part.items()}
+        self.__dict__.update(state or {})
+
+
+_SAFE_BUILTINS = {"dict", "list", "set", "frozenset", "tuple", "str", "bytes", "int", "float", "bool", "object"}
+
+
+class _MetadataUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module == "chromadb" or module.startswith("chromadb."):
+            return _PickledState
+        if module == "builtins" and name in _SAFE_BUILTINS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Unexpected type {module}.{name} in index metadata")
+
+
+def _hnsw_label_ids(segment_dir: str) -> dict:
+    """
+    hnswlib label -> embedding id, from Chroma's index_metadata.pickle (if present).
+    """
+    path = os.path.join(segment_dir, "index_metadata.pickle")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        meta = _MetadataUnpickler(f).load()
+    label_to_id = meta.get("label_to_id") if isinstance(meta, dict) else getattr(meta, "label_to_id", None)
+    return dict(label_to_id or {})
+
+
+class ChromaCollectionReader:
+    """
+    Nearest-neighbour search over a persisted Chroma collection, read-only.
+    """
+
+    def __init__(self, persist_dir: str = DB_PERSIST_DIR, collection_name: str = CHROMA_COLLECTION_NAME):
+        self.persist_dir = persist_dir
+        self.db_path = os.path.join(persist_dir, "chroma.sqlite3")
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"No Chroma database at {self.db_path}")
+
+        self.ids = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.documents = []
+        self.metadatas = []
+        self._load(collection_name)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def _load(self, collection_name):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, name, dimension FROM collections WHERE name = ? OR ? IS NULL ORDER BY name LIMIT 1",
+                (collection_name, collection_name)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Chroma collection '{collection_name}' not found in {self.db_path}")
+            collection_id, self.collection_name, self.dimension = row
+
+            segments = dict(conn.execute("SELECT scope, id FROM segments WHERE collection = ?", (collection_id,)))
+            vector_segment, metadata_segment = segments.get("VECTOR"), segments.get("METADATA")
+
+            # 1. Vectors already flushed to the HNSW segment
+            vectors = {}
+            flushed_seq = 0
+            segment_dir = os.path.join(self.persist_dir, vector_segment or "")
+            if vector_segment and os.path.exists(os.path.join(segment_dir, "header.bin")):
+                labels, matrix = read_hnsw_segment(segment_dir, self.dimension)
+                label_ids = _hnsw_label_ids(segment_dir)
+                if len(labels) and not label_ids:
+                    print(f"Warning: {segment_dir} has no label mapping; its {len(labels)} flushed vectors are skipped.")
+                for label, vector in zip(labels, matrix):
+                    if int(label) in label_ids:
+                        vectors[label_ids[int(label)]] = vector
+                seq = conn.execute("SELECT seq_id FROM max_seq_id WHERE segment_id = ?", (vector_segment,)).fetchone()
+                flushed_seq = int(seq[0]) if seq else 0
+
+            # 2. Newer writes still in the queue, replayed in order
+            topic_rows = conn.execute(
+                "SELECT operation, id, vector, encoding FROM embeddings_queue "
+                "WHERE topic LIKE ? AND seq_id > ? ORDER BY seq_id",
+                (f"%{collection_id}", flushed_seq)
+            )
+            for operation, embedding_id, blob, encoding in topic_rows:
+                if operation == OP_DELETE:
+                    vectors.pop(embedding_id, None)
+                elif blob is not None and (operation != OP_UPDATE or embedding_id in vectors):
+                    if encoding and encoding.upper() != "FLOAT32":
+                        raise ValueError(f"Unsupported Chroma vector encoding '{encoding}'")
+                    vectors[embedding_id] = np.frombuffer(blob, dtype="<f4")
+
+            # 3. Documents + metadata from the metadata segment
+            metadata = {}
+            meta_rows = conn.execute(
+                "SELECT e.embedding_id, m.key, m.string_value, m.int_value, m.float_value, m.bool_value "
+                "FROM embeddings e JOIN embedding_metadata m ON m.id = e.id WHERE e.segment_id = ?",
+                (metadata_segment,)
+            )
+            for embedding_id, key, s, i, f, b in meta_rows:
+                value = next((v for v in (s, i, f) if v is not None), None if b is None else bool(b))
+                metadata.setdefault(embedding_id, {})[key] = value
+
+        self.ids = list(vectors)
+        self.vectors = np.vstack([vectors[i] for i in self.ids]).astype(np.float32) if self.ids \
+            else np.empty((0, self.dimension), dtype=np.float32)
+        self.metadatas = [metadata.get(i, {}) for i in self.ids]
+        self.documents = [meta.pop(DOCUMENT_KEY, "") for meta in self.metadatas]
+        self._sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+        print(f"Chroma collection '{self.collection_name}' opened read-only: {len(self.ids)} vectors ({self.dimension}-dim).")
+
+    def query(self, query_vector, k: int = 1) -> list:
+        """
+        The k nearest stored contracts to `query_vector` (squared L2, Chroma's
+        default space), closest first, as dicts with id, text, metadata,
+        distance and cosine score.
+        """
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query vector has {query.shape[0]} dims; collection expects {self.dimension}")
+        if not self.ids or k <= 0:
+            return []
+
+        dots = self.vectors @ query
+        q_norm = float(query @ query)
+        distances = np.maximum(self._sq_norms - 2 * dots + q_norm, 0.0)
+        cosines = dots / np.maximum(np.sqrt(self._sq_norms * q_norm), 1e-12)
+
+        take = min(k, len(self.ids))
+        top = np.argpartition(distances, take - 1)[:take] if take < len(self.ids) else np.arange(len(self.ids))
+        top = top[np.argsort(distances[top], kind="stable")]
+
+        return [{
+            "id": self.ids[i],
+            "text": self.documents[i],
+            "metadata": self.metadatas[i],
+            "distance": float(distances[i]),
+            "score": float(cosines[i]),
+        } for i in top]
+
+    def search_context(self, query_vector, k: int = 1, min_score: float = 0.0) -> list:
+        """
+        Same case layout as processors.get_similar_case_sets, for a precomputed query embedding.
+        """
+        results = []
+        for hit in self.query(query_vector, k):
+            if hit["score"] <= min_score:
+                continue
+            meta = hit["metadata"]
+            results.append({
+                "text": hit["text"],
+                "score": hit["score"],
+                "classification": {
+                    "Market Segment": meta.get("Market Segment", "Unknown"),
+                    "System Type (General)": meta.get("System Type (General)", "Not Applicable"),
+                    "System Type (Specific)": meta.get("System Type (Specific)", "Not Applicable"),
+                    "System Name (General)": meta.get("System Name (General)", "Not Applicable"),
+                    "System Name (Specific)": meta.get("System Name (Specific)", "Not Applicable"),
+                    "System Piloting": meta.get("System Piloting", "Derived from logic")
+                }
+            })
+        return results
@@ -0,0 +1,110 @@
+"""
+Near-duplicate detection for scraped contract paragraphs.
+
+DoD digests are re-scraped and re-published, so the same announcement often
+shows up several times, sometimes differing only in a modification number,
+contract number or dollar figure. Those numbers are masked, each paragraph is
+reduced to a MinHash signature over word shingles, and LSH banding finds
+candidate pairs without comparing every pair. Candidates whose estimated
+Jaccard similarity clears DEDUP_THRESHOLD are grouped (union-find). One
+representative per group is classified; the rest copy its classification.
+"""
+import re
+import zlib
+
+import numpy as np
+
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE_WORDS
+
+# Masked before shingling: these differ between otherwise identical notices
+MONEY_RE = re.compile(r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s*(?:million|billion))?", re.IGNORECASE)
+IDENTIFIER_RE = re.compile(r"\b(?=[A-Z0-9-]*\d)[A-Z0-9]+(?:-[A-Z0-9]+)+\b|\b[A-Z]+\d{3,}\b")
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+WORD_RE = re.compile(r"[a-z#$]+")
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.default_rng(20240607)
+_PERM_A = _rng.integers(1, _MERSENNE, size=DEDUP_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE, size=DEDUP_NUM_PERM, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    text = MONEY_RE.sub(" $ ", str(text or ""))
+    text = IDENTIFIER_RE.sub(" # ", text)
+    text = NUMBER_RE.sub(" # ", text)
+    return text.lower()
+
+
+def _shingle_hashes(text: str, n: int = DEDUP_SHINGLE_WORDS) -> np.ndarray:
+    words = WORD_RE.findall(normalize_text(text))
+    if len(words) < n:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(texts) -> np.ndarray:
+    """
+    (n_texts, DEDUP_NUM_PERM) MinHash signatures (h(x) = (a*x + b) mod p, per permutation).
+    """
+    texts = list(texts)
+    signatures = np.empty((len(texts), DEDUP_NUM_PERM), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = _shingle_hashes(text)
+        # uint64 products wrap around before the modulo (as in datasketch); still a good hash family
+        signatures[i] = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE).min(axis=0)
+    return signatures
+
+
+def _find(parent: list, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(texts, threshold: float = DEDUP_THRESHOLD, bands: int = DEDUP_BANDS) -> list:
+    """
+    For every text, the index of its cluster representative (the first member
+    in input order). A text with no near-duplicate is its own representative.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    signatures = minhash_signatures(texts)
+    rows_per_band = signatures.shape[1] // bands
+    parent = list(range(len(texts)))
+
+    for band in range(bands):
+        block = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        buckets = {}
+        for i, key in enumerate(map(bytes, block)):
+            buckets.setdefault(key, []).append(i)
+
+        for members in buckets.values():
+            for other in members[1:]:
+                first = members[0]
+                root_a, root_b = _find(parent, first), _find(parent, other)
+                if root_a == root_b:
+                    continue
+                # Verify the LSH candidate on the full signature
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return [_find(parent, i) for i in range(len(texts))]
+
+
+def dedup_report(representatives: list) -> dict:
+    """
+    Rows, clusters and reduction ratio (share of rows that need no LLM call).
+    """
+    rows = len(representatives)
+    clusters = len(set(representatives))
+    return {
+        "rows": rows,
+        "clusters": clusters,
+        "duplicates": rows - clusters,
+        "reduction_ratio": round((rows - clusters) / rows, 4) if rows else 0.0,
+    }
@@ -0,0 +1,611 @@
+"""
+Offline comparison harnesses for extraction settings.
+
+Usage:
+    python -m src.evaluation modes scraped_raw_data.csv --limit 50
+    python -m src.evaluation prefix scraped_raw_data.csv
+    python -m src.evaluation rules scraped_raw_data.csv
+    python -m src.evaluation ann "Market Segment.xlsx" --rows 50000
+    python -m src.evaluation rerank "Market Segment.xlsx" --rows 50
+    python -m src.evaluation dedup scraped_raw_data.csv
+    python -m src.evaluation suppliers "Market Segment.xlsx"
+    python -m src.evaluation rendering "Market Segment.xlsx" --limit 100
+"""
+import argparse
+import difflib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    COL_DESC, COL_DATE, MAX_CONCURRENCY, RERANK_CANDIDATES, PROMPT_TAXONOMY_FORMAT, PROMPT_GEOGRAPHY_FORMAT
+)
+from src.ann_index import ExactSparseIndex, IVFIndex
+from src.memory_index import fit_memory, top_k_similar, TEXT_COLUMN
+from src.reranker import benchmark_reranker
+from src.dedup import cluster_near_duplicates, dedup_report
+from src.suppliers import SUPPLIER_RESOLVER
+from data.taxonomy import SUPPLIER_LIST
+from src.processors import (
+    classify_records, get_similar_case_sets, call_llm,
+    build_taxonomy_request, build_geography_request, build_domestic_request,
+    build_financial_request, build_consolidated_request,
+    domestic_is_forced, TAXONOMY_KEYS, GEOGRAPHY_KEYS, FINANCIAL_KEYS
+)
+from src.rate_limiter import estimate_tokens, get_rate_limiter
+from src.rule_extractor import pre_classify, confident_fields
+from src.prompt_rendering import rendering_report
+from src.taxonomy_model import TAXONOMY
+
+COMPARE_FIELDS = TAXONOMY_KEYS + GEOGRAPHY_KEYS + [
+    "Domestic Content", "Supplier Name", "Program Type",
+    "Quantity", "Value Certainty", "Value (Million)"
+]
+
+
+def _normalize(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return str(value).strip().casefold()
+
+
+def _rows_from_frame(df: pd.DataFrame, limit: int = None) -> list:
+    if limit:
+        df = df.head(limit)
+    return [(str(r.get(COL_DESC, "")), str(r.get(COL_DATE, ""))) for _, r in df.iterrows()]
+
+
+def field_agreement(left: list, right: list, fields=COMPARE_FIELDS) -> pd.DataFrame:
+    """
+    Per-field share of rows where two result lists give the same (normalized) value.
+    Rows that errored on either side are skipped.
+    """
+    pairs = [(a, b) for a, b in zip(left, right) if "__error__" not in a and "__error__" not in b]
+    records = []
+    for field in fields:
+        same = sum(_normalize(a.get(field)) == _normalize(b.get(field)) for a, b in pairs)
+        records.append({"Field": field, "Agreement": round(same / len(pairs), 4) if pairs else 0.0})
+    return pd.DataFrame(records)
+
+
+def field_accuracy(results: list, gold: pd.DataFrame, fields=COMPARE_FIELDS) -> pd.DataFrame:
+    """
+    Per-field accuracy against analyst labels, for every field that `gold` has values for.
+    """
+    records = []
+    for field in fields:
+        if field not in gold.columns:
+            continue
+        labelled = [
+            (res, label) for res, label in zip(results, gold[field])
+            if "__error__" not in res and _normalize(label)
+        ]
+        if not labelled:
+            continue
+        correct = sum(_normalize(res.get(field)) == _normalize(label) for res, label in labelled)
+        records.append({"Field": field, "Accuracy": round(correct / len(labelled), 4), "Labelled Rows": len(labelled)})
+    return pd.DataFrame(records)
+
+
+def estimate_input_tokens(description: str, mode: str) -> int:
+    """
+    Approximate prompt tokens one row sends in the given extraction mode.
+    """
+    similar_cases = get_similar_case_sets([description])[0]
+    if mode == "one_shot":
+        requests = [build_consolidated_request(description, similar_cases)]
+    else:
+        requests = [
+            build_taxonomy_request(description, similar_cases),
+            build_geography_request(description),
+            build_domestic_request(description, {}),
+            build_financial_request(description),
+        ]
+    return sum(estimate_tokens(system, prompt) for prompt, system in requests)
+
+
+def compare_extraction_modes(df: pd.DataFrame, baseline: str = "four_call", candidate: str = "one_shot",
+                             limit: int = None, max_concurrency: int = MAX_CONCURRENCY) -> dict:
+    """
+    Runs both extraction modes over the same rows and reports:
+    - agreement: per-field agreement of `candidate` with `baseline`
+    - accuracy: per-field accuracy of each mode where `df` carries analyst labels
+    - cost: wall time, LLM requests actually sent per row (cache hits excluded,
+      retries included) and estimated input tokens per row
+    """
+    rows = _rows_from_frame(df, limit)
+    gold = df.head(len(rows)).reset_index(drop=True)
+
+    limiter = get_rate_limiter()
+    outputs, cost = {}, []
+    for mode in (baseline, candidate):
+        sent_before = limiter.sent
+        started = time.perf_counter()
+        outputs[mode] = classify_records(rows, max_concurrency=max_concurrency, mode=mode)
+        elapsed = time.perf_counter() - started
+        sent = limiter.sent - sent_before
+
+        tokens = [estimate_input_tokens(desc, mode) for desc, _ in rows]
+        cost.append({
+            "Mode": mode,
+            "Rows": len(rows),
+            "Errors": sum("__error__" in r for r in outputs[mode]),
+            "Seconds": round(elapsed, 2),
+            "Requests / Row": round(sent / len(rows), 2) if rows else 0.0,
+            "Est. Input Tokens / Row": round(sum(tokens) / len(tokens)) if tokens else 0
+        })
+
+    accuracy = None
+    if any(field in gold.columns for field in COMPARE_FIELDS):
+        base_acc = field_accuracy(outputs[baseline], gold).rename(columns={"Accuracy": baseline})
+        cand_acc = field_accuracy(outputs[candidate], gold).rename(columns={"Accuracy": candidate})
+        if not base_acc.empty:
+            accuracy = base_acc.merge(cand_acc.drop(columns=["Labelled Rows"]), on="Field")
+
+    return {
+        "agreement": field_agreement(outputs[baseline], outputs[candidate]),
+        "accuracy": accuracy,
+        "cost": pd.DataFrame(cost),
+        "results": outputs
+    }
+
+
+# ==========================================
+# PROMPT PREFIX STABILITY
+# ==========================================
+_ROW_SENTINEL = "\u2063ROW\u2063"
+
+
+def _stage_requests(description: str, similar_cases, geo_result: dict) -> dict:
+    return {
+        "taxonomy": build_taxonomy_request(description, similar_cases),
+        "geography": build_geography_request(description),
+        "domestic": build_domestic_request(description, geo_result),
+        "financial": build_financial_request(description),
+        "one_shot": build_consolidated_request(description, similar_cases),
+    }
+
+
+def static_prompt_prefixes() -> dict:
+    """
+    stage -> (system message, static user-prompt prefix). The prefix is the
+    part of the prompt that every rendering shares, across sentinel rows with
+    and without a similar-case reference and with different supplier overlap.
+    """
+    sentinel_case = {"text": _ROW_SENTINEL, "classification": {"Market Segment": _ROW_SENTINEL}}
+    sentinel_geo = {"Customer Country": _ROW_SENTINEL, "Supplier Country": _ROW_SENTINEL}
+
+    variants = [
+        _stage_requests(_ROW_SENTINEL, sentinel_case, sentinel_geo),
+        _stage_requests(_ROW_SENTINEL, None, sentinel_geo),
+        _stage_requests(f"Boeing {_ROW_SENTINEL}", None, sentinel_geo),
+    ]
+
+    prefixes = {}
+    for stage, (_, system) in variants[0].items():
+        assert _ROW_SENTINEL not in system, f"{stage}: per-row data leaked into the system message"
+        common = os.path.commonprefix([variant[stage][0] for variant in variants])
+        prefixes[stage] = (system, common.split(_ROW_SENTINEL)[0])
+    return prefixes
+
+
+def check_prompt_prefix_stability(descriptions) -> pd.DataFrame:
+    """
+    Asserts that, for every row, each stage's system message is identical and
+    its prompt starts with the stage's static prefix, then reports how much
+    of an average request that cacheable prefix covers.
+    """
+    prefixes = static_prompt_prefixes()
+    totals = {stage: 0 for stage in prefixes}
+    descriptions = [str(d) for d in descriptions]
+
+    for description, similar_cases in zip(descriptions, get_similar_case_sets(descriptions)):
+        geo_result = {"Customer Country": "USA", "Supplier Country": "USA"}
+        for stage, (prompt, system) in _stage_requests(description, similar_cases, geo_result).items():
+            static_system, static_prefix = prefixes[stage]
+            assert system == static_system, f"{stage}: system message differs between rows"
+            assert prompt.startswith(static_prefix), f"{stage}: static prefix broken for row {description[:60]!r}"
+            totals[stage] += estimate_tokens(system, prompt)
+
+    records = []
+    for stage, (system, prefix) in prefixes.items():
+        prefix_tokens = estimate_tokens(system, prefix)
+        avg_tokens = totals[stage] / len(descriptions) if descriptions else prefix_tokens
+        records.append({
+            "Stage": stage,
+            "Static Prefix Tokens": prefix_tokens,
+            "Avg Request Tokens": round(avg_tokens),
+            "Cacheable Share": round(prefix_tokens / avg_tokens, 4) if avg_tokens else 0.0
+        })
+    return pd.DataFrame(records)
+
+
+# ==========================================
+# RULE PRE-CLASSIFIER COVERAGE
+# ==========================================
+def rule_coverage(df: pd.DataFrame, fields=GEOGRAPHY_KEYS + FINANCIAL_KEYS) -> dict:
+    """
+    How much the rule pre-classifier answers on its own:
+    - fields: per-field share of rows answered at or above the confidence threshold,
+      and agreement with analyst labels where `df` has them
+    - prompts: share of rows that skip the Geography / Domestic Content prompts
+    """
+    headers = df["Header"].fillna("") if "Header" in df.columns else [""] * len(df)
+    rules = [pre_classify(str(desc), str(header)) for desc, header in zip(df[COL_DESC].fillna(""), headers)]
+    known = [confident_fields(r) for r in rules]
+
+    records = []
+    for field in fields:
+        answered = [(k[field], label) for k, label in zip(known, df.get(field, [None] * len(df))) if field in k]
+        record = {"Field": field, "Answered": round(len(answered) / len(known), 4) if known else 0.0}
+        labelled = [(value, label) for value, label in answered if _normalize(label)]
+        if labelled:
+            record["Agreement"] = round(sum(_normalize(v) == _normalize(l) for v, l in labelled) / len(labelled), 4)
+        records.append(record)
+
+    skip_geo = [len(confident_fields(r, GEOGRAPHY_KEYS)) == len(GEOGRAPHY_KEYS) for r in rules]
+    skip_dom = [skip and domestic_is_forced(k) for skip, k in zip(skip_geo, known)]
+    prompts = pd.DataFrame([
+        {"Prompt": "geography", "Skipped": round(sum(skip_geo) / len(rules), 4) if rules else 0.0},
+        {"Prompt": "domestic", "Skipped": round(sum(skip_dom) / len(rules), 4) if rules else 0.0},
+    ])
+    return {"fields": pd.DataFrame(records), "prompts": prompts}
+
+
+def _perturbed_corpus(texts: list, n_rows: int, drop_rate: float, rng) -> list:
+    """
+    `n_rows` synthetic descriptions: random seed descriptions with a share of
+    their words dropped, standing in for a memory far larger than the workbook.
+    """
+    corpus = []
+    for i in rng.integers(0, len(texts), size=n_rows):
+        words = texts[i].split()
+        keep = rng.random(len(words)) >= drop_rate
+        corpus.append(" ".join(w for w, kept in zip(words, keep) if kept) or texts[i])
+    return corpus
+
+
+def ann_recall_benchmark(df: pd.DataFrame, n_rows: int = 50000, n_queries: int = 500, k: int = 3,
+                         n_probes=(1, 2, 4, 8, 16, 32), refine: int = None, drop_rate: float = 0.3,
+                         seed: int = 0) -> pd.DataFrame:
+    """
+    Recall@k and per-query latency of the IVF index against the exact sparse
+    search, on a synthetic memory grown from the workbook descriptions.
+    """
+    rng = np.random.default_rng(seed)
+    texts = [t for t in df[TEXT_COLUMN].fillna("").astype(str) if t.strip()]
+    corpus = pd.DataFrame({TEXT_COLUMN: _perturbed_corpus(texts, n_rows, drop_rate, rng)})
+    vectorizer, example_vectors = fit_memory(corpus)
+    queries = vectorizer.transform(_perturbed_corpus(texts, n_queries, drop_rate, rng))
+
+    def timed(search):
+        start = time.perf_counter()
+        matches = search()
+        return matches, (time.perf_counter() - start) * 1000 / n_queries
+
+    start = time.perf_counter()
+    exact = ExactSparseIndex(example_vectors)
+    truth, exact_ms = timed(lambda: exact.search(queries, k))
+    records = [{"Backend": "exact", "n_probe": "-", f"Recall@{k}": 1.0, "ms/query": round(exact_ms, 3),
+                "Build (s)": round(time.perf_counter() - start, 2)}]
+
+    start = time.perf_counter()
+    ivf = IVFIndex(example_vectors) if refine is None else IVFIndex(example_vectors, refine=refine)
+    build_s = time.perf_counter() - start
+    for n_probe in n_probes:
+        if n_probe > ivf.n_lists:
+            break
+        found, ms = timed(lambda: ivf.search(queries, k, n_probe=n_probe))
+        # Score-based recall: ties among equally similar rows count as hits
+        kth = truth["score"][:, -1:]
+        hits = (found["example_idx"] >= 0) & (found["score"] >= kth - 1e-6)
+        records.append({"Backend": f"ivf ({ivf.n_lists} lists, refine {ivf.refine})", "n_probe": n_probe,
+                        f"Recall@{k}": round(float(hits.mean()), 4), "ms/query": round(ms, 3),
+                        "Build (s)": round(build_s, 2)})
+
+    return pd.DataFrame(records)
+
+
+def rerank_latency_benchmark(df: pd.DataFrame, n_rows: int = 50, n_candidates: int = None) -> pd.DataFrame:
+    """
+    Cross-encoder cost per row (one description x its top TF-IDF candidates)
+    for fp32 vs int8 and a few batch sizes.
+    """
+    n_candidates = n_candidates or RERANK_CANDIDATES
+
+    texts = df[TEXT_COLUMN].fillna("").astype(str).tolist()
+    vectorizer, example_vectors = fit_memory(df)
+    queries = texts[:n_rows]
+    # Skip the first hit (the row itself) so candidates are genuine neighbours
+    matches = top_k_similar(vectorizer.transform(queries), example_vectors, n_candidates + 1)
+    pairs = [(q, [texts[i] for i in row["example_idx"][1:] if i >= 0]) for q, row in zip(queries, matches)]
+
+    configs = [
+        {"quantize": False, "batch_tokens": 4096},
+        {"quantize": True, "batch_tokens": 4096},
+        {"quantize": True, "batch_tokens": 1024},
+        {"quantize": True, "batch_tokens": 16384},
+    ]
+    return pd.DataFrame(benchmark_reranker(pairs, configs))
+
+
+def dedup_clusters(df: pd.DataFrame, threshold: float = None) -> dict:
+    """
+    Reduction ratio of the near-duplicate stage plus the largest clusters.
+    """
+    texts = df[COL_DESC].fillna("").astype(str).tolist()
+    representatives = cluster_near_duplicates(texts) if threshold is None else cluster_near_duplicates(texts, threshold)
+    sizes = pd.Series(representatives).value_counts()
+    largest = pd.DataFrame({
+        "Rows": sizes.head(10).values,
+        "Representative": [texts[rep][:100] for rep in sizes.head(10).index],
+    })
+    return {"summary": dedup_report(representatives), "largest": largest[largest["Rows"] > 1]}
+
+
+LEGACY_SORTED_SUPPLIERS = sorted(SUPPLIER_LIST, key=len, reverse=True)
+
+
+def legacy_taxonomy_match(extracted_name: str) -> str:
+    """
+    The original linear-scan get_best_taxonomy_match, kept as the reference
+    SupplierResolver must agree with.
+    """
+    if not extracted_name or extracted_name.lower() in ["unknown", "not applicable", "multiple"]:
+        return "Unknown"
+
+    clean_name = extracted_name.strip()
+    clean_name_lower = clean_name.lower()
+
+    for supplier in LEGACY_SORTED_SUPPLIERS:
+        if clean_name_lower == supplier.lower():
+            return supplier
+
+    first_word = clean_name.split(" ")[0]
+    candidates = [s for s in LEGACY_SORTED_SUPPLIERS if first_word.lower() in s.lower()]
+    if candidates:
+        matches = difflib.get_close_matches(clean_name, candidates, n=1, cutoff=0.4)
+        if matches:
+            return matches[0]
+
+    matches = difflib.get_close_matches(clean_name, LEGACY_SORTED_SUPPLIERS, n=1, cutoff=0.7)
+    if matches:
+        return matches[0]
+
+    for supplier in LEGACY_SORTED_SUPPLIERS:
+        if supplier.lower() in clean_name_lower:
+            return supplier
+
+    return clean_name
+
+
+def supplier_golden_set(df: pd.DataFrame = None, seed: int = 0) -> list:
+    """
+    Supplier names the way they reach the resolver: taxonomy names with case,
+    suffix, typo and truncation noise, plus lead-clause names read from
+    real descriptions (if `df` is given) and a few sentinels.
+    """
+    rng = np.random.default_rng(seed)
+    names = ["", "Unknown", "Multiple", "N/A", "HP Inc", "  Boeing  ", "The Boeing Co.", "Acme Widgets LLC"]
+    for name in rng.choice(SUPPLIER_LIST, size=min(400, len(SUPPLIER_LIST)), replace=False):
+        names.append(name.upper())
+        names.append(name + " Inc.")
+        words = name.split()
+        names.append(" ".join(words[:max(1, len(words) - 1)]))
+        if len(name) > 4:
+            cut = int(rng.integers(1, len(name) - 1))
+            names.append(name[:cut] + name[cut + 1:])
+        names.append("Subsidiary of " + name)
+    if df is not None:
+        for text in df[COL_DESC].fillna("").astype(str):
+            supplier = pre_classify(text).get("Supplier Name")
+            if supplier:
+                names.append(supplier["value"])
+    return names
+
+
+def supplier_resolver_check(names: list) -> dict:
+    """
+    Agreement of SupplierResolver with the legacy matcher, and time per name for both.
+    """
+    start = time.perf_counter()
+    legacy = [legacy_taxonomy_match(n) for n in names]
+    legacy_us = (time.perf_counter() - start) * 1e6 / len(names)
+
+    # Uncached path, so the timing is per distinct name
+    start = time.perf_counter()
+    resolved = [SUPPLIER_RESOLVER._match(n)[0] for n in names]
+    resolver_us = (time.perf_counter() - start) * 1e6 / len(names)
+
+    mismatches = [(n, a, b) for n, a, b in zip(names, legacy, resolved) if a != b]
+    return {
+        "names": len(names),
+        "mismatches": mismatches,
+        "legacy_us_per_name": round(legacy_us, 1),
+        "resolver_us_per_name": round(resolver_us, 1),
+    }
+
+
+# ==========================================
+# PROMPT RENDERING A/B
+# ==========================================
+def _rendering_arm(descriptions: list, taxonomy_format: str, geography_format: str,
+                   max_concurrency: int = MAX_CONCURRENCY) -> list:
+    """
+    Taxonomy + geography answers per row with the given renderings (the two
+    calls whose prompts embed the rendered reference data).
+    """
+    def run(description):
+        try:
+            taxonomy = call_llm(*build_taxonomy_request(description, None, taxonomy_format))
+            geography = call_llm(*build_geography_request(description, geography_format))
+            return {**taxonomy, **geography}
+        except Exception as e:
+            return {"__error__": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_concurrency))) as pool:
+        return list(pool.map(run, descriptions))
+
+
+def compare_prompt_renderings(df: pd.DataFrame, baseline: tuple = ("verbose", "verbose"), candidate: tuple = (None, None),
+                              limit: int = None, max_concurrency: int = MAX_CONCURRENCY) -> dict:
+    """
+    A/B of the taxonomy/geography prompt renderings, each arm a
+    (taxonomy format, geography format) pair (None = configured default):
+    - accuracy: per-field accuracy of each arm where `df` carries analyst labels
+    - agreement: per-field agreement of `candidate` with `baseline`
+    - cost: estimated input tokens per row and share of valid taxonomy paths
+    No similar cases are added, so memory rows cannot answer for themselves
+    and only the rendering differs between arms.
+    """
+    rows = _rows_from_frame(df, limit)
+    descriptions = [desc for desc, _ in rows]
+    gold = df.head(len(rows)).reset_index(drop=True)
+    fields = TAXONOMY_KEYS[:3] + GEOGRAPHY_KEYS
+
+    outputs, cost = {}, []
+    for name, (taxonomy_format, geography_format) in (("baseline", baseline), ("candidate", candidate)):
+        taxonomy_format = taxonomy_format or PROMPT_TAXONOMY_FORMAT
+        geography_format = geography_format or PROMPT_GEOGRAPHY_FORMAT
+        outputs[name] = _rendering_arm(descriptions, taxonomy_format, geography_format, max_concurrency)
+        tokens = [
+            estimate_tokens(*build_taxonomy_request(desc, None, taxonomy_format))
+            + estimate_tokens(*build_geography_request(desc, geography_format))
+            for desc in descriptions
+        ]
+        answered = [r for r in outputs[name] if "__error__" not in r]
+        valid = sum(TAXONOMY.is_valid(r.get("Market Segment"), r.get("System Type (General)"), r.get("System Type (Specific)"))
+                    for r in answered)
+        cost.append({
+            "Arm": name,
+            "Taxonomy Format": taxonomy_format,
+            "Geography Format": geography_format,
+            "Errors": len(outputs[name]) - len(answered),
+            "Est. Input Tokens / Row": round(sum(tokens) / len(tokens)) if tokens else 0,
+            "Valid Taxonomy Paths": round(valid / len(answered), 4) if answered else 0.0
+        })
+
+    accuracy = None
+    base_acc = field_accuracy(outputs["baseline"], gold, fields).rename(columns={"Accuracy": "baseline"})
+    if not base_acc.empty:
+        cand_acc = field_accuracy(outputs["candidate"], gold, fields).rename(columns={"Accuracy": "candidate"})
+        accuracy = base_acc.merge(cand_acc.drop(columns=["Labelled Rows"]), on="Field")
+
+    return {
+        "agreement": field_agreement(outputs["baseline"], outputs["candidate"], fields),
+        "accuracy": accuracy,
+        "cost": pd.DataFrame(cost),
+        "results": outputs
+    }
+
+
+def _load_frame(path: str) -> pd.DataFrame:
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path, encoding="utf-8")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Extraction comparison harnesses")
+    sub = arg_parser.add_subparsers(dest="command", required=True)
+
+    modes = sub.add_parser("modes", help="Compare four-call vs one-shot extraction")
+    modes.add_argument("path", help="CSV/Excel with a 'Description of Contract' column (labels optional)")
+    modes.add_argument("--limit", type=int, default=None)
+    modes.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+
+    prefix = sub.add_parser("prefix", help="Check that prompt prefixes stay byte-identical across rows")
+    prefix.add_argument("path", help="CSV/Excel with a 'Description of Contract' column")
+
+    rules = sub.add_parser("rules", help="Report how many fields the rule pre-classifier answers")
+    rules.add_argument("path", help="CSV/Excel with 'Description of Contract' (and ideally 'Header') columns")
+
+    ann = sub.add_parser("ann", help="Recall vs latency of the ANN memory index against exact search")
+    ann.add_argument("path", help="Memory workbook with a 'Description of Contract' column")
+    ann.add_argument("--rows", type=int, default=50000, help="Synthetic memory size")
+    ann.add_argument("--queries", type=int, default=500)
+    ann.add_argument("-k", type=int, default=3)
+    ann.add_argument("--refine", type=int, default=None, help="Override IVF_REFINE")
+
+    rerank = sub.add_parser("rerank", help="Cross-encoder re-ranking latency per row (fp32 vs int8, batch sizes)")
+    rerank.add_argument("path", help="Memory workbook with a 'Description of Contract' column")
+    rerank.add_argument("--rows", type=int, default=50)
+
+    dedup = sub.add_parser("dedup", help="Near-duplicate clusters and LLM row reduction ratio")
+    dedup.add_argument("path", help="CSV/Excel with a 'Description of Contract' column")
+    dedup.add_argument("--threshold", type=float, default=None, help="Override DEDUP_THRESHOLD")
+
+    suppliers = sub.add_parser("suppliers", help="Check SupplierResolver against the legacy matcher on a golden set")
+    suppliers.add_argument("path", nargs="?", default=None,
+                           help="Optional CSV/Excel whose descriptions add real supplier names")
+
+    rendering = sub.add_parser("rendering", help="Token counts of the prompt renderings; with a file, A/B them on LLM answers")
+    rendering.add_argument("path", nargs="?", default=None,
+                           help="CSV/Excel with a 'Description of Contract' column (analyst labels optional)")
+    rendering.add_argument("--limit", type=int, default=None, help="Rows to classify with both renderings")
+    rendering.add_argument("--taxonomy-format", default=None, help="Candidate taxonomy format (default: configured)")
+    rendering.add_argument("--geography-format", default=None, help="Candidate geography format (default: configured)")
+    rendering.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+
+    args = arg_parser.parse_args()
+
+    if args.command == "modes":
+        report = compare_extraction_modes(_load_frame(args.path), limit=args.limit, max_concurrency=args.concurrency)
+        print("\n=== COST ===")
+        print(report["cost"].to_string(index=False))
+        print("\n=== AGREEMENT (one_shot vs four_call) ===")
+        print(report["agreement"].to_string(index=False))
+        if report["accuracy"] is not None:
+            print("\n=== ACCURACY VS LABELS ===")
+            print(report["accuracy"].to_string(index=False))
+
+    elif args.command == "prefix":
+        report = check_prompt_prefix_stability(_load_frame(args.path)[COL_DESC].fillna(""))
+        print(report.to_string(index=False))
+
+    elif args.command == "rules":
+        report = rule_coverage(_load_frame(args.path))
+        print(report["fields"].to_string(index=False))
+        print()
+        print(report["prompts"].to_string(index=False))
+
+    elif args.command == "ann":
+        report = ann_recall_benchmark(_load_frame(args.path), n_rows=args.rows, n_queries=args.queries, k=args.k,
+                                      refine=args.refine)
+        print(report.to_string(index=False))
+
+    elif args.command == "rerank":
+        report = rerank_latency_benchmark(_load_frame(args.path), n_rows=args.rows)
+        print(report.to_string(index=False))
+
+    elif args.command == "dedup":
+        report = dedup_clusters(_load_frame(args.path), args.threshold)
+        print(report["summary"])
+        print(report["largest"].to_string(index=False))
+
+    elif args.command == "suppliers":
+        report = supplier_resolver_check(supplier_golden_set(_load_frame(args.path) if args.path else None))
+        print(f"{report['names']} names | {len(report['mismatches'])} mismatches | "
+              f"legacy {report['legacy_us_per_name']} us/name | resolver {report['resolver_us_per_name']} us/name")
+        for name, legacy, resolved in report["mismatches"][:20]:
+            print(f"  {name!r}: legacy={legacy!r} resolver={resolved!r}")
+
+    elif args.command == "rendering":
+        print(rendering_report().to_string(index=False))
+        if args.path:
+            report = compare_prompt_renderings(_load_frame(args.path), candidate=(args.taxonomy_format, args.geography_format),
+                                               limit=args.limit, max_concurrency=args.concurrency)
+            print("\n=== COST ===")
+            print(report["cost"].to_string(index=False))
+            print("\n=== AGREEMENT (candidate vs verbose) ===")
+            print(report["agreement"].to_string(index=False))
+            if report["accuracy"] is not None:
+                print("\n=== ACCURACY VS LABELS ===")
+                print(report["accuracy"].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Compact columnar storage for the analyst memory examples.
+
+Only the description and the six label columns are kept:
+- all descriptions live in one UTF-8 byte buffer, sliced by an offsets array;
+- labels are integer codes (one row per example, one column per label) into a
+  single value dictionary shared by all label columns ("Not Applicable" is
+  stored once, not once per cell).
+
+A lookup reads one slice and one short code row; no pandas objects are built.
+The arrays are saved as .npy files and can be memory-mapped on load.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+TEXT_COLUMN = "Description of Contract"
+LABEL_COLUMNS = (
+    "Market Segment",
+    "System Type (General)",
+    "System Type (Specific)",
+    "System Name (General)",
+    "System Name (Specific)",
+    "System Piloting",
+)
+STORE_COLUMNS = (TEXT_COLUMN,) + LABEL_COLUMNS
+
+MISSING_CODE = -1
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+class ExampleStore:
+    def __init__(self, text_buffer: np.ndarray, text_offsets: np.ndarray, label_codes: np.ndarray, label_values: list):
+        self.text_buffer = text_buffer
+        self.text_offsets = text_offsets
+        self.label_codes = label_codes
+        self.label_values = label_values
+
+    def __len__(self):
+        return len(self.text_offsets) - 1
+
+    # ---------- building ----------
+    @classmethod
+    def from_records(cls, records) -> "ExampleStore":
+        """
+        From an iterable of dicts (extra keys are ignored, missing labels stored as missing).
+        """
+        encoded, offsets = [], [0]
+        values, value_codes = [], {}
+        rows = []
+        for record in records:
+            text = record.get(TEXT_COLUMN)
+            data = ("" if _is_missing(text) else str(text)).encode("utf-8")
+            encoded.append(data)
+            offsets.append(offsets[-1] + len(data))
+
+            row = []
+            for column in LABEL_COLUMNS:
+                value = record.get(column)
+                if _is_missing(value):
+                    row.append(MISSING_CODE)
+                    continue
+                value = str(value)
+                if value not in value_codes:
+                    value_codes[value] = len(values)
+                    values.append(value)
+                row.append(value_codes[value])
+            rows.append(row)
+
+        code_dtype = np.int16 if len(values) < np.iinfo(np.int16).max else np.int32
+        return cls(
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(rows, dtype=code_dtype).reshape(len(rows), len(LABEL_COLUMNS)),
+            values,
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ExampleStore":
+        columns = [c for c in STORE_COLUMNS if c in df.columns]
+        return cls.from_records(df[columns].to_dict("records"))
+
+    def extend(self, records) -> "ExampleStore":
+        """
+        New store with `records` appended (the original is left untouched).
+        """
+        return ExampleStore.from_records(list(self.records()) + list(records))
+
+    # ---------- lookups ----------
+    def text(self, idx: int) -> str:
+        start, end = self.text_offsets[idx], self.text_offsets[idx + 1]
+        return self.text_buffer[start:end].tobytes().decode("utf-8")
+
+    def labels(self, idx: int) -> tuple:
+        """
+        Label values in LABEL_COLUMNS order (None where missing).
+        """
+        return tuple(None if code < 0 else self.label_values[code] for code in self.label_codes[idx].tolist())
+
+    def classification(self, idx: int, defaults: dict) -> dict:
+        """
+        Label column -> value, with `defaults[column]` filling missing labels.
+        """
+        return {
+            column: defaults.get(column) if value is None else value
+            for column, value in zip(LABEL_COLUMNS, self.labels(idx))
+        }
+
+    def record(self, idx: int) -> dict:
+        labels = {c: v for c, v in zip(LABEL_COLUMNS, self.labels(idx)) if v is not None}
+        return {TEXT_COLUMN: self.text(idx), **labels}
+
+    def records(self):
+        for idx in range(len(self)):
+            yield self.record(idx)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.records()), columns=list(STORE_COLUMNS))
+
+    # ---------- persistence ----------
+    def save(self, directory: str):
+        np.save(os.path.join(directory, "text_buffer.npy"), self.text_buffer)
+        np.save(os.path.join(directory, "text_offsets.npy"), self.text_offsets)
+        np.save(os.path.join(directory, "label_codes.npy"), self.label_codes)
+        with open(os.path.join(directory, "labels.json"), "w", encoding="utf-8") as f:
+            json.dump({"columns": list(LABEL_COLUMNS), "values": self.label_values}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = "r") -> "ExampleStore":
+        with open(os.path.join(directory, "labels.json"), encoding="utf-8") as f:
+            labels = json.load(f)
+        if labels["columns"] != list(LABEL_COLUMNS):
+            raise ValueError("Saved example store has different label columns")
+        return cls(
+            np.load(os.path.join(directory, "text_buffer.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, "text_offsets.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, "label_codes.npy"), mmap_mode=mmap_mode),
+            labels["values"],
+        )
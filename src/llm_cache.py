@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_MB
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache for LLM JSON responses.
+    Entries live in a SQLite file and are keyed by a hash of
+    (model, system message, prompt, response format). call_llm runs at temperature=0,
+    so a re-run on the same input can be served without a network call.
+    The file is bounded to `max_bytes`; least recently used entries are evicted first.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024, enabled=LLM_CACHE_ENABLED):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+
+        # One connection shared by all worker threads, serialized by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        self._total_bytes = int(row[0])
+
+    @staticmethod
+    def make_key(model: str, system_message: str, prompt_text: str, response_format=None) -> str:
+        payload = json.dumps([model, system_message, prompt_text, response_format], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the cached response dict, or None on a miss (or when disabled).
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, response: dict):
+        if not self.enabled:
+            return
+
+        blob = json.dumps(response, ensure_ascii=False)
+        size = len(blob.encode("utf-8"))
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, size, time.time())
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Drops least recently used entries until the cache fits in max_bytes.
+        Caller must hold self._lock.
+        """
+        while self._total_bytes > self.max_bytes:
+            victims = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_access ASC LIMIT 100"
+            ).fetchall()
+            if not victims:
+                self._total_bytes = 0
+                return
+
+            for key, size in victims:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def invalidate(self, key: str):
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._total_bytes -= old[0]
+
+    def clear(self):
+        """
+        Invalidates every cached response and resets the counters.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.execute("VACUUM")
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Process-wide cache instance (created on first use).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
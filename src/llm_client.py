@@ -0,0 +1,63 @@
+import os
+import threading
+
+import httpx
+from openai import OpenAI
+
+from config import (
+    BASE_URL, LLM_TIMEOUT_SECONDS, LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_KEEPALIVE_EXPIRY_SECONDS
+)
+
+# (base_url, api_key) -> OpenAI client. OpenAI clients (and the httpx pool
+# underneath) are thread-safe, so one instance is shared by every worker.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _build_http_client() -> httpx.Client:
+    return httpx.Client(
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        follow_redirects=True
+    )
+
+
+def get_client(base_url: str = BASE_URL, api_key: str = None) -> OpenAI:
+    """
+    Returns the long-lived client for (base_url, api_key), creating it on first use.
+    api_key defaults to OPENAI_API_KEY, so a key entered at runtime in the
+    Streamlit sidebar gets its own client without restarting the app.
+    """
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    registry_key = (base_url, api_key)
+
+    with _clients_lock:
+        client = _clients.get(registry_key)
+        if client is None:
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=_build_http_client(),
+                # Retries are scheduled by call_llm (rate limiter + backoff)
+                max_retries=0
+            )
+            _clients[registry_key] = client
+        return client
+
+
+def close_clients():
+    """
+    Closes every pooled client (and its open connections).
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                print(f"⚠️ Failed closing LLM client: {e}")
+        _clients.clear()
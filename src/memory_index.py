@@ -0,0 +1,239 @@
+"""
+Persisted TF-IDF memory index.
+
+Fitting the analyst memory means parsing "Market Segment.xlsx" and refitting a
+TfidfVectorizer on every start. The fitted state (vocabulary, IDF weights,
+sparse example matrix, label columns) is saved once under
+MEMORY_INDEX_DIR/<workbook sha256>/ and later loaded with numpy memory
+mapping. Any edit to the workbook changes its hash, so a stale index is never used.
+Examples are kept as a columnar ExampleStore (src/example_store.py), not a DataFrame.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import MEMORY_INDEX_DIR
+from src.example_store import ExampleStore, TEXT_COLUMN, STORE_COLUMNS
+
+INDEX_FORMAT_VERSION = 2
+
+# Bumping any of these invalidates every saved index
+VECTORIZER_PARAMS = {"stop_words": "english"}
+
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(json.dumps([INDEX_FORMAT_VERSION, VECTORIZER_PARAMS, sklearn.__version__]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def index_dir_for(path: str, index_root: str = MEMORY_INDEX_DIR) -> str:
+    return os.path.join(index_root, file_fingerprint(path)[:32])
+
+
+def fit_memory(df_examples: pd.DataFrame) -> tuple:
+    """
+    Fits (vectorizer, example matrix) on the memory examples.
+    """
+    texts = df_examples[TEXT_COLUMN].fillna("").astype(str)
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    return vectorizer, vectorizer.fit_transform(texts).tocsr()
+
+
+def save_memory_index(index_dir: str, vectorizer, example_vectors, examples: ExampleStore, source: str = ""):
+    """
+    Writes the index into `index_dir` atomically (temp dir + rename), so a
+    concurrent reader never sees a half-written artifact.
+    """
+    parent = os.path.dirname(os.path.abspath(index_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=parent)
+
+    try:
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        with open(os.path.join(tmp_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+
+        np.save(os.path.join(tmp_dir, "idf.npy"), vectorizer.idf_)
+        matrix = sp.csr_matrix(example_vectors)
+        np.save(os.path.join(tmp_dir, "matrix_data.npy"), matrix.data)
+        np.save(os.path.join(tmp_dir, "matrix_indices.npy"), matrix.indices)
+        np.save(os.path.join(tmp_dir, "matrix_indptr.npy"), matrix.indptr)
+        examples.save(tmp_dir)
+
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "source": source,
+                "rows": int(matrix.shape[0]),
+                "terms": int(matrix.shape[1]),
+                "format": INDEX_FORMAT_VERSION,
+                "sklearn": sklearn.__version__
+            }, f)
+
+        try:
+            os.replace(tmp_dir, index_dir)
+        except OSError:
+            # Another process published the same fingerprint first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_memory_index(index_dir: str) -> tuple:
+    """
+    Loads (vectorizer, example matrix, ExampleStore) from a saved index.
+    The matrix and example arrays are memory-mapped read-only.
+    """
+    with open(os.path.join(index_dir, "vocabulary.json"), encoding="utf-8") as f:
+        terms = json.load(f)
+
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms)}
+    vectorizer.idf_ = np.load(os.path.join(index_dir, "idf.npy"))
+
+    data, indices, indptr = (
+        np.load(os.path.join(index_dir, f"matrix_{part}.npy"), mmap_mode="r")
+        for part in ("data", "indices", "indptr")
+    )
+    example_vectors = sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(terms)), copy=False)
+    examples = ExampleStore.load(index_dir)
+
+    return vectorizer, example_vectors, examples
+
+
+def get_memory_index(path: str, index_root: str = MEMORY_INDEX_DIR) -> tuple:
+    """
+    (vectorizer, example matrix, ExampleStore) for the workbook at `path`:
+    loaded from the persisted index when its fingerprint matches, otherwise
+    fitted from the workbook and persisted for the next start.
+    Raises KeyError when the workbook has no 'Description of Contract' column.
+    """
+    index_dir = index_dir_for(path, index_root)
+    if os.path.exists(os.path.join(index_dir, "meta.json")):
+        try:
+            return load_memory_index(index_dir)
+        except Exception as e:
+            print(f"⚠️ Memory index at '{index_dir}' unreadable, rebuilding: {e}")
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+    # Only the description + label columns are read
+    df_examples = pd.read_excel(path, usecols=lambda column: column in STORE_COLUMNS)
+    if TEXT_COLUMN not in df_examples.columns:
+        raise KeyError(TEXT_COLUMN)
+
+    vectorizer, example_vectors = fit_memory(df_examples)
+    examples = ExampleStore.from_frame(df_examples)
+    try:
+        save_memory_index(index_dir, vectorizer, example_vectors, examples, source=os.path.basename(path))
+    except OSError as e:
+        print(f"⚠️ Could not persist memory index (continuing in memory): {e}")
+    return vectorizer, example_vectors, examples
+
+
+# ==========================================
+# BATCHED RETRIEVAL
+# ==========================================
+# One (example row, cosine score) pair; example_idx is -1 where fewer than k examples exist
+SIMILAR_MATCH_DTYPE = np.dtype([("example_idx", np.int32), ("score", np.float32)])
+
+
+def top_k_similar(query_vectors, example_vectors, k: int = 1, chunk_rows: int = 1024) -> np.ndarray:
+    """
+    Top-k examples for every query row as an (n_queries, k) SIMILAR_MATCH_DTYPE
+    array, best first. TF-IDF rows are L2-normalised, so one sparse
+    query x example product gives the cosine scores; queries are processed in
+    chunks to bound the dense score block.
+    """
+    n_queries, n_examples = query_vectors.shape[0], example_vectors.shape[0]
+    matches = np.zeros((n_queries, k), dtype=SIMILAR_MATCH_DTYPE)
+    matches["example_idx"] = -1
+    if n_queries == 0 or n_examples == 0 or k <= 0:
+        return matches
+
+    take = min(k, n_examples)
+    examples_t = sp.csr_matrix(example_vectors).T.tocsc()
+
+    for start in range(0, n_queries, chunk_rows):
+        scores = (query_vectors[start:start + chunk_rows] @ examples_t).toarray()
+        if take == 1:
+            top = scores.argmax(axis=1)[:, None]
+        elif take < n_examples:
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        else:
+            top = np.broadcast_to(np.arange(n_examples), (scores.shape[0], n_examples))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+
+        block = matches[start:start + chunk_rows]
+        block["example_idx"][:, :take] = np.take_along_axis(top, order, axis=1)
+        block["score"][:, :take] = np.take_along_axis(top_scores, order, axis=1)
+
+    return matches
+
+
+def merge_top_k(left: np.ndarray, right: np.ndarray, right_offset: int, k: int) -> np.ndarray:
+    """
+    Merges two top-k match arrays for the same queries (e.g. base index and
+    appended rows); `right` example indices are shifted by `right_offset`.
+    """
+    right = right.copy()
+    right["example_idx"] = np.where(right["example_idx"] >= 0, right["example_idx"] + right_offset, -1)
+    both = np.concatenate([left, right], axis=1)
+    score = np.where(both["example_idx"] >= 0, both["score"], -np.inf)
+    order = np.argsort(-score, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(both, order, axis=1)
+
+
+def mmr_select(candidate_idx: np.ndarray, candidate_scores: np.ndarray, example_vectors, k: int,
+               mmr_lambda: float = 0.7, duplicate_threshold: float = 0.9,
+               costs: np.ndarray = None, budget: float = None) -> list:
+    """
+    Maximal Marginal Relevance over one query's candidates: repeatedly takes the
+    candidate with the best lambda * relevance - (1 - lambda) * (max similarity
+    to anything already taken). Candidates at or above `duplicate_threshold`
+    similarity to a pick are dropped as near-duplicates, and a candidate whose
+    `costs` entry no longer fits in `budget` is skipped. Returns positions into
+    `candidate_idx`, in pick order.
+    """
+    n = len(candidate_idx)
+    if n == 0 or k <= 0:
+        return []
+
+    vectors = sp.csr_matrix(example_vectors)[candidate_idx]
+    pairwise = (vectors @ vectors.T).toarray()
+    relevance = np.asarray(candidate_scores, dtype=np.float64)
+
+    available = np.ones(n, dtype=bool)
+    redundancy = np.zeros(n)
+    remaining = np.inf if budget is None else float(budget)
+    picked = []
+
+    while len(picked) < k and available.any():
+        if costs is not None:
+            available &= costs <= remaining
+            if not available.any():
+                break
+
+        mmr = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+        best = int(mmr.argmax())
+        picked.append(best)
+
+        available[best] = False
+        available &= pairwise[best] < duplicate_threshold
+        redundancy = np.maximum(redundancy, pairwise[best])
+        if costs is not None:
+            remaining -= costs[best]
+
+    return picked
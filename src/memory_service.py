@@ -0,0 +1,471 @@
+"""
+Process-wide analyst memory with hot reload and incremental growth.
+
+The memory workbook can be replaced at any time (the Streamlit uploader writes
+a new "Market Segment.xlsx"). MemoryService keeps the loaded index as one
+immutable MemorySnapshot and a watcher thread polls the workbook:
+
+- mtime/size unchanged -> nothing to do;
+- changed -> hash it (memory_index.file_fingerprint); same content -> nothing;
+- new content -> rebuild the index in the background, then publish the new
+  snapshot with a single reference assignment.
+
+Readers take `service.snapshot()` once per batch and use it throughout, so
+they never wait on a rebuild and never see a half-swapped index. One service
+per process (get_memory_service) is shared by every caller, including all
+Streamlit sessions.
+
+Reviewed rows added at runtime (add_contracts) are journaled to a write-ahead
+log (MEMORY_WAL_PATH), vectorized with the frozen vocabulary and published as
+the snapshot's tail. Every MEMORY_REWEIGHT_EVERY additions a background thread
+refits vocabulary/IDF over base + tail, saves the merged index as a checkpoint
+(MEMORY_INDEX_DIR/<workbook hash>.wal-<last folded entry>) and moves the folded
+entries from the log to MEMORY_WAL_ARCHIVE_PATH, so a restart loads the
+checkpoint and replays only the newer entries.
+
+Checkpoints belong to one workbook version. A newly uploaded workbook has
+none, so it is loaded with every archived and logged row replayed on top,
+except rows the workbook already holds (same description and labels).
+
+The pre-TF-IDF memory (contracts embedded into the Chroma collection in
+DB_PERSIST_DIR) is served read-only next to it: search_embedded opens it on
+first use and answers a locally computed query embedding.
+"""
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from config import (
+    MEMORY_WATCH_SECONDS, MEMORY_INDEX_DIR, MEMORY_WAL_PATH, MEMORY_WAL_ARCHIVE_PATH, MEMORY_REWEIGHT_EVERY,
+    DB_PERSIST_DIR
+)
+from src.ann_index import build_index
+from src.chroma_store import ChromaCollectionReader
+from src.example_store import ExampleStore, TEXT_COLUMN, LABEL_COLUMNS
+from src.memory_index import (
+    get_memory_index, file_fingerprint, fit_memory, save_memory_index, load_memory_index,
+    top_k_similar, merge_top_k
+)
+
+
+class MemorySnapshot(namedtuple("MemorySnapshot", [
+    "vectorizer", "example_vectors", "examples", "fingerprint", "path",
+    "index", "tail_vectors", "tail_examples", "wal_seq"
+])):
+    """
+    Base index (workbook, or its latest checkpoint) plus the tail of rows added
+    since. Example IDs run over the base rows first, then the tail rows.
+    `wal_seq` is the last write-ahead log entry reflected in the snapshot.
+    """
+
+    @property
+    def n_base(self) -> int:
+        return 0 if self.examples is None else len(self.examples)
+
+    @property
+    def n_tail(self) -> int:
+        return 0 if self.tail_examples is None else len(self.tail_examples)
+
+    def search(self, query_vectors, k: int = 1) -> np.ndarray:
+        """
+        Top-k over base (through the ANN/exact index) and tail (exact), as one
+        memory_index.SIMILAR_MATCH_DTYPE array.
+        """
+        matches = self.index.search(query_vectors, k)
+        if self.tail_vectors is not None:
+            matches = merge_top_k(matches, top_k_similar(query_vectors, self.tail_vectors, k), self.n_base, k)
+        return matches
+
+    def example(self, idx: int) -> tuple:
+        """
+        (ExampleStore, row) holding example `idx`.
+        """
+        return (self.examples, idx) if idx < self.n_base else (self.tail_examples, idx - self.n_base)
+
+    def vectors(self, idx) -> sp.csr_matrix:
+        """
+        TF-IDF rows of examples `idx`, in that order.
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        if self.tail_vectors is None:
+            return self.example_vectors[idx]
+        in_base = idx < self.n_base
+        rows = sp.vstack([self.example_vectors[idx[in_base]], self.tail_vectors[idx[~in_base] - self.n_base]], format="csr")
+        order = np.concatenate([np.flatnonzero(in_base), np.flatnonzero(~in_base)])
+        return rows[np.argsort(order)]
+
+
+EMPTY_SNAPSHOT = MemorySnapshot(None, None, None, None, None, None, None, None, -1)
+
+
+class MemoryService:
+    def __init__(self, path: str, watch_seconds: float = MEMORY_WATCH_SECONDS, wal_path: str = MEMORY_WAL_PATH,
+                 index_root: str = MEMORY_INDEX_DIR, archive_path: str = MEMORY_WAL_ARCHIVE_PATH,
+                 embedded_dir: str = DB_PERSIST_DIR):
+        self.path = path
+        self.watch_seconds = watch_seconds
+        self.wal_path = wal_path
+        self.archive_path = archive_path
+        self.index_root = index_root
+        self.embedded_dir = embedded_dir
+
+        self._snapshot = EMPTY_SNAPSHOT
+        self._stat = None  # (mtime_ns, size) of the workbook behind the snapshot
+        self._fingerprint = None
+
+        self._rebuild_lock = threading.Lock()  # one rebuild at a time; readers never take it
+        self._write_lock = threading.Lock()  # write-ahead log + snapshot publication
+        self._next_seq = 0
+        self._reweight_thread = None
+        self._loaded = threading.Event()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._embedded = None  # ChromaCollectionReader, False once found missing
+        self._embedded_lock = threading.Lock()
+
+    # ---------- readers ----------
+    def snapshot(self) -> MemorySnapshot:
+        """
+        The current index. The first call loads it synchronously; later calls
+        return immediately (reloads happen in the background).
+        """
+        if not self._loaded.is_set():
+            self.refresh(wait=True)
+        return self._snapshot
+
+    def embedded_collection(self):
+        """
+        The persisted Chroma collection in `embedded_dir`, opened read-only on
+        first use; None if there is none.
+        """
+        with self._embedded_lock:
+            if self._embedded is None:
+                try:
+                    self._embedded = ChromaCollectionReader(self.embedded_dir)
+                except (FileNotFoundError, KeyError) as e:
+                    print(f"⚠️ Embedded memory unavailable: {e}")
+                    self._embedded = False
+            return self._embedded if self._embedded is not False else None
+
+    def search_embedded(self, query_vector, k: int = 1, min_score: float = 0.0) -> list:
+        """
+        Similar cases from the embedded memory for a locally computed query
+        embedding, in the get_similar_case_sets case layout ([] without one).
+        """
+        collection = self.embedded_collection()
+        return collection.search_context(query_vector, k, min_score) if collection is not None else []
+
+    @property
+    def is_ready(self) -> bool:
+        return self._snapshot.vectorizer is not None
+
+    # ---------- reload ----------
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load_base(self, fingerprint: str) -> tuple:
+        """
+        (vectorizer, example matrix, ExampleStore, last folded log entry) from
+        the newest checkpoint of this workbook, or from the workbook itself.
+        """
+        checkpoint_dir, checkpoint_seq = self._latest_checkpoint(fingerprint)
+        if checkpoint_dir is not None:
+            try:
+                return (*load_memory_index(checkpoint_dir), checkpoint_seq)
+            except Exception as e:
+                print(f"⚠️ Memory checkpoint '{checkpoint_dir}' unreadable, loading the workbook: {e}")
+        return (*get_memory_index(self.path, self.index_root), -1)
+
+    def _rebuild(self):
+        with self._rebuild_lock:
+            stat = self._file_stat()
+            if stat is not None and stat == self._stat and self._loaded.is_set():
+                return
+
+            try:
+                if stat is None:
+                    if self._stat is not None or not self._loaded.is_set():
+                        print(f"⚠️ Memory file not found: '{self.path}' (Memory disabled)")
+                    self._snapshot, self._stat, self._fingerprint = EMPTY_SNAPSHOT, None, None
+                    return
+
+                fingerprint = file_fingerprint(self.path)
+                if fingerprint == self._fingerprint:
+                    # Touched but identical content
+                    self._stat = stat
+                    return
+
+                try:
+                    vectorizer, example_vectors, examples, checkpoint_seq = self._load_base(fingerprint)
+                except KeyError:
+                    print(f"⚠️ Memory load failed: 'Description of Contract' column not found in {self.path}")
+                    self._stat = stat  # don't retry until the file changes again
+                    return
+
+                base = MemorySnapshot(vectorizer, example_vectors, examples, fingerprint, self.path,
+                                      build_index(example_vectors), None, None, checkpoint_seq)
+
+                # Publish: a single reference assignment, atomic for readers
+                with self._write_lock:
+                    entries = self._pending_additions(examples, checkpoint_seq)
+                    self._snapshot = self._with_tail(base, entries)
+                self._stat, self._fingerprint = stat, fingerprint
+                replayed = f" + {len(entries)} added" if entries else ""
+                print(f"✅ Memory loaded successfully from '{self.path}' | Rows: {len(examples)}{replayed}")
+
+                if len(entries) >= MEMORY_REWEIGHT_EVERY:
+                    self._schedule_reweight()
+
+            except Exception as e:
+                # Keep serving the previous snapshot
+                print(f"❌ CRITICAL: Failed loading memory file '{self.path}': {e}")
+            finally:
+                self._loaded.set()
+
+    def refresh(self, wait: bool = False):
+        """
+        Checks the workbook now. With wait=False the rebuild (if any) runs on
+        a background thread and the current snapshot keeps serving meanwhile.
+        """
+        if wait:
+            self._rebuild()
+        else:
+            threading.Thread(target=self._rebuild, daemon=True).start()
+
+    # ---------- write-ahead log ----------
+    def _read_wal(self, path: str = None) -> list:
+        """
+        Log entries ({"seq", "text", "metadata", "added_at"}) in order, from
+        the write-ahead log or `path` (the archive).
+        """
+        path = path or self.wal_path
+        entries = []
+        if not path or not os.path.exists(path):
+            return entries
+        with open(path, encoding="utf-8") as f:
+            for position, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    continue
+                entry.setdefault("seq", position)
+                entries.append(entry)
+        if entries:
+            self._next_seq = max(self._next_seq, entries[-1]["seq"] + 1)
+        return entries
+
+    def _pending_additions(self, examples: ExampleStore, after_seq: int) -> list:
+        """
+        Archived and logged entries newer than `after_seq` (one per seq, in
+        order) that `examples` does not already hold. Caller holds _write_lock.
+        """
+        by_seq = {e["seq"]: e for e in self._read_wal(self.archive_path) + self._read_wal() if e["seq"] > after_seq}
+        if not by_seq:
+            return []
+        present = {(examples.text(i), examples.labels(i)) for i in range(len(examples))}
+        return [
+            e for _, e in sorted(by_seq.items())
+            if (e["text"], tuple(e.get("metadata", {}).get(c) for c in LABEL_COLUMNS)) not in present
+        ]
+
+    def _append_entries(self, path: str, entries: list):
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _log_additions(self, records: list) -> list:
+        """
+        Journals `records` (fsync'd) and returns their log entries. Caller holds _write_lock.
+        """
+        now = datetime.datetime.now().isoformat()
+        entries = []
+        for record in records:
+            metadata = {c: str(record[c]) for c in LABEL_COLUMNS if c in record and pd.notna(record[c])}
+            entries.append({"seq": self._next_seq, "text": str(record[TEXT_COLUMN]), "metadata": metadata, "added_at": now})
+            self._next_seq += 1
+        self._append_entries(self.wal_path, entries)
+        return entries
+
+    def _truncate_wal(self, folded_seq: int):
+        """
+        Moves the log entries folded into a checkpoint to the archive, then
+        drops them from the log (atomic rewrite). A crash in between leaves
+        an entry in both files, which readers de-duplicate by seq.
+        Caller holds _write_lock.
+        """
+        if not self.wal_path or not os.path.exists(self.wal_path):
+            return
+        entries = self._read_wal()
+        folded = [e for e in entries if e["seq"] <= folded_seq]
+        if folded:
+            self._append_entries(self.archive_path, folded)
+        keep = [e for e in entries if e["seq"] > folded_seq]
+        parent = os.path.dirname(os.path.abspath(self.wal_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in keep))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.wal_path)
+
+    @staticmethod
+    def _with_tail(snapshot: MemorySnapshot, entries: list) -> MemorySnapshot:
+        """
+        `snapshot` with log `entries` appended to its tail, vectorized with
+        its vocabulary. Costs O(tail), and the tail stays below
+        MEMORY_REWEIGHT_EVERY rows between re-weights.
+        """
+        if not entries:
+            return snapshot
+        records = [{TEXT_COLUMN: e["text"], **e.get("metadata", {})} for e in entries]
+        vectors = snapshot.vectorizer.transform([e["text"] for e in entries])
+        return snapshot._replace(
+            tail_vectors=vectors if snapshot.tail_vectors is None else sp.vstack([snapshot.tail_vectors, vectors], format="csr"),
+            tail_examples=ExampleStore.from_records(records) if snapshot.tail_examples is None else snapshot.tail_examples.extend(records),
+            wal_seq=entries[-1]["seq"]
+        )
+
+    # ---------- growth ----------
+    def add_contracts(self, records) -> int:
+        """
+        Adds reviewed rows (dicts with 'Description of Contract' and label
+        columns) to the memory: journaled, vectorized with the frozen
+        vocabulary and published at once; IDF is refreshed in the background.
+        Returns the number of rows added (0 while no memory is loaded).
+        """
+        records = [r for r in records if str(r.get(TEXT_COLUMN) or "").strip()]
+        if not records or self.snapshot().vectorizer is None:
+            return 0
+
+        with self._write_lock:
+            entries = self._log_additions(records)
+            self._snapshot = self._with_tail(self._snapshot, entries)
+            n_tail = self._snapshot.n_tail
+
+        if n_tail >= MEMORY_REWEIGHT_EVERY:
+            self._schedule_reweight()
+        return len(records)
+
+    def _checkpoint_prefix(self, fingerprint: str) -> str:
+        return f"{fingerprint[:32]}.wal-"
+
+    def _latest_checkpoint(self, fingerprint: str) -> tuple:
+        """
+        (directory, last folded log entry) of this workbook's newest checkpoint, or (None, -1).
+        """
+        prefix = self._checkpoint_prefix(fingerprint)
+        try:
+            names = os.listdir(self.index_root)
+        except FileNotFoundError:
+            return None, -1
+        found = [
+            (int(name[len(prefix):]), name) for name in names
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+            and os.path.exists(os.path.join(self.index_root, name, "meta.json"))
+        ]
+        if not found:
+            return None, -1
+        seq, name = max(found)
+        return os.path.join(self.index_root, name), seq
+
+    def _remove_checkpoints(self, fingerprint: str, keep: str):
+        prefix = self._checkpoint_prefix(fingerprint)
+        for name in os.listdir(self.index_root):
+            path = os.path.join(self.index_root, name)
+            if name.startswith(prefix) and os.path.abspath(path) != os.path.abspath(keep):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _schedule_reweight(self):
+        if self._reweight_thread is not None and self._reweight_thread.is_alive():
+            return
+        self._reweight_thread = threading.Thread(target=self.reweight, name="memory-reweight", daemon=True)
+        self._reweight_thread.start()
+
+    def reweight(self):
+        """
+        Refits vocabulary + IDF (and rebuilds the search index) over base and
+        tail of the current snapshot, saves the result as a checkpoint, then
+        swaps it in and archives the folded log entries. Snapshots are immutable, so the
+        fit and the checkpoint happen without any lock; the write lock is
+        only held for the swap. Rows added meanwhile stay in the tail,
+        re-vectorized with the new vocabulary.
+        """
+        snapshot = self._snapshot
+        if snapshot.vectorizer is None or snapshot.tail_examples is None:
+            return
+
+        checkpoint_dir = os.path.join(self.index_root, f"{self._checkpoint_prefix(snapshot.fingerprint)}{snapshot.wal_seq}")
+        try:
+            frame = pd.concat([snapshot.examples.to_frame(), snapshot.tail_examples.to_frame()], ignore_index=True)
+            vectorizer, example_vectors = fit_memory(frame)
+            examples = ExampleStore.from_frame(frame)
+            save_memory_index(checkpoint_dir, vectorizer, example_vectors, examples,
+                              source=f"{os.path.basename(snapshot.path)} + log up to {snapshot.wal_seq}")
+            merged = MemorySnapshot(vectorizer, example_vectors, examples, snapshot.fingerprint, snapshot.path,
+                                    build_index(example_vectors), None, None, snapshot.wal_seq)
+        except Exception as e:
+            print(f"❌ Error re-weighting memory: {e}")
+            return
+
+        with self._write_lock:
+            current = self._snapshot
+            if current.examples is not snapshot.examples:
+                # The workbook was reloaded meanwhile: this merge is stale
+                shutil.rmtree(checkpoint_dir, ignore_errors=True)
+                return
+            remaining = [e for e in self._read_wal() if e["seq"] > snapshot.wal_seq]
+            self._snapshot = self._with_tail(merged, remaining)
+            self._truncate_wal(snapshot.wal_seq)
+
+        self._remove_checkpoints(snapshot.fingerprint, keep=checkpoint_dir)
+        print(f"✅ Memory re-weighted: {len(examples)} examples (checkpoint '{checkpoint_dir}')")
+
+    # ---------- watcher ----------
+    def _watch(self):
+        while not self._stop.wait(self.watch_seconds):
+            if self._file_stat() != self._stat:
+                self._rebuild()
+
+    def start_watching(self):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="memory-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_memory_service(path: str) -> MemoryService:
+    """
+    The process-wide MemoryService for `path` (created and watched on first use).
+    """
+    key = os.path.abspath(path)
+    with _services_lock:
+        if key not in _services:
+            service = MemoryService(path)
+            if service.watch_seconds and service.watch_seconds > 0:
+                service.start_watching()
+            _services[key] = service
+        return _services[key]
@@ -1,66 +1,71 @@
 import json
 import datetime
 import time
+import numpy as np
 import pandas as pd
 import re
-import difflib
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from dateutil import parser
 from dateutil.relativedelta import relativedelta
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from openai import OpenAI
+import openai
 
 # Imports from other files
-from config import MODEL_NAME, BASE_URL
+from config import (
+    MODEL_NAME, BASE_URL, MAX_CONCURRENCY, EXTRACTION_MODE, LLM_MAX_RETRIES,
+    SIMILAR_EXAMPLES_K, SIMILAR_EXAMPLES_TOKEN_BUDGET, SIMILAR_EXAMPLE_CHARS, SIMILAR_EXAMPLES_MIN_SCORE,
+    SIMILAR_EXAMPLES_MMR_LAMBDA, SIMILAR_EXAMPLES_DUPLICATE_SIM, DEDUP_ENABLED,
+    RERANK_ENABLED, RERANK_CANDIDATES
+)
 from data.taxonomy import (
-    TAXONOMY_STR, VALID_DEPENDENCIES, GEOGRAPHY_MAPPING,
-    VALID_OPERATORS, SUPPLIER_LIST, PROGRAM_TYPES, DOMESTIC_CONTENT_OPTIONS
+    VALID_OPERATORS, PROGRAM_TYPES, DOMESTIC_CONTENT_OPTIONS
 )
 from src.prompts import (
-    GEOGRAPHY_PROMPT, FINANCIAL_PROMPT, DOMESTIC_CONTENT_PROMPT
+    GEOGRAPHY_PROMPT, FINANCIAL_PROMPT, DOMESTIC_CONTENT_PROMPT, CONSOLIDATED_PROMPT
 )
+from src.llm_cache import get_llm_cache
+from src.suppliers import format_supplier_candidates, resolve_suppliers, SUPPLIER_RESOLVER
+from src.rule_extractor import pre_classify, confident_fields
+from src.dedup import cluster_near_duplicates, dedup_report
+from src.llm_client import get_client
+from src.memory_index import mmr_select
+from src.memory_service import get_memory_service
+from src.rate_limiter import get_rate_limiter, backoff_delay, retry_after_seconds, estimate_tokens
+from src.taxonomy_model import TAXONOMY
+from src.prompt_rendering import render_taxonomy, render_geography
+from src.reranker import get_reranker
 
 # ==========================================
 # ✅ MEMORY FILE PATH (STREAMLIT CLOUD SAFE)
 # ==========================================
 MEMORY_FILE_NAME = "Market Segment.xlsx"   # <-- Must be saved in app root by Streamlit uploader
 
-vectorizer = None
-example_vectors = None
-df_examples = None
+
+def memory_snapshot():
+    """
+    The current analyst memory (vectorizer, example_vectors, examples, ...).
+    Served by a process-wide MemoryService (src/memory_service.py) that
+    reloads the workbook in the background when it changes, so callers
+    never block on a rebuild. Take one snapshot per batch and pass it down.
+    """
+    return get_memory_service(MEMORY_FILE_NAME).snapshot()
 
 
 def load_memory():
     """
-    Loads Memory Excel and builds TF-IDF vectors.
+    Checks the Memory Excel now and reloads its TF-IDF index if it changed
+    (persisted per workbook hash, see src/memory_index.py).
     Works on Streamlit Cloud & local systems.
     """
-    global vectorizer, example_vectors, df_examples
-
-    vectorizer = None
-    example_vectors = None
-    df_examples = None
-
-    try:
-        if os.path.exists(MEMORY_FILE_NAME):
-            df_examples = pd.read_excel(MEMORY_FILE_NAME)
+    get_memory_service(MEMORY_FILE_NAME).refresh(wait=True)
 
-            if "Description of Contract" not in df_examples.columns:
-                print(f"⚠️ Memory load failed: 'Description of Contract' column not found in {MEMORY_FILE_NAME}")
-                return
 
-            # Build TF-IDF
-            vectorizer = TfidfVectorizer(stop_words="english")
-            example_vectors = vectorizer.fit_transform(df_examples["Description of Contract"].astype(str))
-
-            print(f"✅ Memory loaded successfully from '{MEMORY_FILE_NAME}' | Rows: {len(df_examples)}")
-        else:
-            print(f"⚠️ Memory file not found: '{MEMORY_FILE_NAME}' (Memory disabled)")
-
-    except Exception as e:
-        print(f"❌ CRITICAL: Failed loading memory file '{MEMORY_FILE_NAME}': {e}")
-        vectorizer, example_vectors, df_examples = None, None, None
+def add_to_memory(records) -> int:
+    """
+    Adds analyst-reviewed rows (dicts with 'Description of Contract' and the
+    classification columns) to the shared memory without refitting it; they
+    are journaled and survive restarts (see MemoryService.add_contracts).
+    """
+    return get_memory_service(MEMORY_FILE_NAME).add_contracts(records)
 
 
 # ✅ Load Memory at import time (Streamlit Cloud safe)
@@ -70,106 +75,230 @@ load_memory()
 # ==========================================
 # 1. HELPER FUNCTIONS
 # ==========================================
-SORTED_SUPPLIER_LIST = sorted(SUPPLIER_LIST, key=len, reverse=True)
-
-
 def get_best_taxonomy_match(extracted_name: str) -> str:
-    if not extracted_name or extracted_name.lower() in ["unknown", "not applicable", "multiple"]:
-        return "Unknown"
+    # Indexed exact -> brand fuzzy -> global fuzzy -> substring passes (src/suppliers.py)
+    return SUPPLIER_RESOLVER.resolve(extracted_name)
 
-    clean_name = extracted_name.strip()
-    clean_name_lower = clean_name.lower()
 
-    # Exact Match
-    for supplier in SORTED_SUPPLIER_LIST:
-        if clean_name_lower == supplier.lower():
-            return supplier
+DEFAULT_SYSTEM_MESSAGE = "You are a helpful assistant. Please respond in JSON format."
 
-    # Brand Name Filtering
-    first_word = clean_name.split(" ")[0]
-    candidates = [s for s in SORTED_SUPPLIER_LIST if first_word.lower() in s.lower()]
+# Errors worth retrying: throttling, timeouts, dropped connections and 5xx
+RETRYABLE_LLM_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
 
-    if candidates:
-        matches = difflib.get_close_matches(clean_name, candidates, n=1, cutoff=0.4)
-        if matches:
-            return matches[0]
 
-    # Global Fuzzy Match
-    matches = difflib.get_close_matches(clean_name, SORTED_SUPPLIER_LIST, n=1, cutoff=0.7)
-    if matches:
-        return matches[0]
+class LLMUnavailableError(RuntimeError):
+    """
+    Raised when an LLM call still fails after all retries, so the row is
+    reported as an error instead of silently becoming an empty classification.
+    """
 
-    # Substring Safety Net
-    for supplier in SORTED_SUPPLIER_LIST:
-        if supplier.lower() in clean_name_lower:
-            return supplier
 
-    return clean_name
+JSON_OBJECT_FORMAT = {"type": "json_object"}
 
 
-def call_llm(prompt_text: str, system_message: str = "You are a helpful assistant. Please respond in JSON format.") -> dict:
+def call_llm(prompt_text: str, system_message: str = DEFAULT_SYSTEM_MESSAGE, use_cache: bool = True,
+             response_format: dict = None) -> dict:
     """
     Safe LLM wrapper.
-    If API fails, returns {} instead of crashing.
+    Requests are paced by the shared rate limiter; throttling, timeouts and
+    5xx errors are retried with jittered exponential backoff (honouring
+    Retry-After) and raise LLMUnavailableError once retries are exhausted.
+    Any other failure returns {} instead of crashing.
+    Successful responses are stored in the persistent LLM cache;
+    pass use_cache=False to force a fresh call.
+    `response_format` defaults to plain JSON mode; pass a json_schema format
+    for structured output.
     """
-    time.sleep(0.2)
+    response_format = response_format or JSON_OBJECT_FORMAT
 
-    try:
-        client = OpenAI(base_url=BASE_URL)
-
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt_text}
-            ],
-            temperature=0,
-            response_format={"type": "json_object"}
-        )
+    cache = get_llm_cache()
+    cache_key = cache.make_key(MODEL_NAME, system_message, prompt_text, response_format)
+
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(system_message, prompt_text)
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        limiter.acquire(estimated_tokens)
+
+        try:
+            client = get_client(BASE_URL)
+
+            raw_response = client.chat.completions.with_raw_response.create(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": prompt_text}
+                ],
+                temperature=0,
+                response_format=response_format
+            )
+            limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+
+            if response.usage is not None:
+                limiter.adjust_tokens(response.usage.total_tokens - estimated_tokens)
 
-        content = response.choices[0].message.content
-        if not content:
-            print("⚠️ LLM returned empty response content.")
+            content = response.choices[0].message.content
+            if not content:
+                print("⚠️ LLM returned empty response content.")
+                return {}
+
+            result = json.loads(content)
+            if result:
+                cache.put(cache_key, result)
+
+            return result
+
+        except RETRYABLE_LLM_ERRORS as e:
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            limiter.update_from_headers(headers)
+
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMUnavailableError(f"LLM call failed after {attempt + 1} attempts: {e}") from e
+
+            delay = backoff_delay(attempt, retry_after_seconds(headers))
+            if isinstance(e, openai.RateLimitError):
+                limiter.pause(delay)
+
+            print(f"⚠️ LLM call retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+        except Exception as e:
+            print(f"❌ LLM Call Error: {e}")
             return {}
 
-        return json.loads(content)
+    return {}
 
-    except Exception as e:
-        print(f"❌ LLM Call Error: {e}")
-        return {}
 
+SIMILARITY_THRESHOLD = SIMILAR_EXAMPLES_MIN_SCORE  # below this cosine score the memory has no useful precedent
 
-def get_similar_example(new_text: str):
+
+# Fallbacks for labels missing from the memory workbook
+EXAMPLE_LABEL_DEFAULTS = {
+    "Market Segment": "Unknown",
+    "System Type (General)": "Unknown",
+    "System Type (Specific)": "Unknown",
+    "System Name (General)": "Unknown",
+    "System Name (Specific)": "Unknown",
+    "System Piloting": "Derived from logic"
+}
+
+
+def _example_case(idx: int, score: float = None, memory=None) -> dict:
+    examples, row = (memory or memory_snapshot()).example(idx)
+    return {
+        "text": examples.text(row),
+        "score": None if score is None else round(float(score), 4),
+        "classification": examples.classification(row, EXAMPLE_LABEL_DEFAULTS)
+    }
+
+
+def search_similar_batch(texts, k: int = 1, memory=None):
     """
-    Finds the single most similar contract from the analyst memory using TF-IDF.
-    Returns the text and correct classification.
+    Top-k analyst-memory matches for many descriptions in one vectorized pass
+    (one transform, one index search over the workbook rows plus the rows
+    added since). Returns an (n, k) array of (example_idx, score) records,
+    see memory_index.SIMILAR_MATCH_DTYPE, or None when memory is not loaded.
     """
-    if vectorizer is None or df_examples is None or example_vectors is None:
+    memory = memory or memory_snapshot()
+    if memory.vectorizer is None:
         return None
+    query_vectors = memory.vectorizer.transform([str(t) for t in texts])
+    return memory.search(query_vectors, k)
 
+
+def get_similar_examples(texts) -> list:
+    """
+    get_similar_example for a whole batch: one entry per text, None where no
+    example clears SIMILARITY_THRESHOLD.
+    """
+    texts = list(texts)
     try:
-        new_vec = vectorizer.transform([str(new_text)])
-        similarities = cosine_similarity(new_vec, example_vectors).flatten()
-        best_idx = similarities.argmax()
-
-        if similarities[best_idx] > 0.1:
-            row = df_examples.iloc[best_idx]
-            return {
-                "text": row["Description of Contract"],
-                "classification": {
-                    "Market Segment": row.get("Market Segment", "Unknown"),
-                    "System Type (General)": row.get("System Type (General)", "Unknown"),
-                    "System Type (Specific)": row.get("System Type (Specific)", "Unknown"),
-                    "System Name (General)": row.get("System Name (General)", "Unknown"),
-                    "System Name (Specific)": row.get("System Name (Specific)", "Unknown"),
-                    "System Piloting": row.get("System Piloting", "Derived from logic")
-                }
-            }
+        memory = memory_snapshot()
+        matches = search_similar_batch(texts, k=1, memory=memory)
+        if matches is None:
+            return [None] * len(texts)
+        return [
+            _example_case(int(best["example_idx"]), best["score"], memory) if best["score"] > SIMILARITY_THRESHOLD else None
+            for best in matches[:, 0]
+        ]
+    except Exception as e:
+        print(f"❌ Error finding similar examples: {e}")
+        return [None] * len(texts)
+
+
+def _case_tokens(case: dict) -> int:
+    return estimate_tokens(str(case["text"])[:SIMILAR_EXAMPLE_CHARS], json.dumps(case["classification"]))
+
+
+def get_similar_case_sets(texts, k: int = SIMILAR_EXAMPLES_K, token_budget: int = SIMILAR_EXAMPLES_TOKEN_BUDGET) -> list:
+    """
+    k-shot version of get_similar_examples: for each text, up to `k` analyst
+    examples chosen by MMR (relevant but not redundant, near-duplicates
+    dropped) whose excerpts fit in `token_budget` together. Each case carries
+    its cosine "score". Retrieval for the whole batch is one sparse product.
+    With RERANK_ENABLED (and the cross-encoder available), MMR relevance is
+    the cross-encoder score of each candidate instead of its cosine.
+    """
+    texts = list(texts)
+    try:
+        memory = memory_snapshot()
+        reranker = get_reranker() if RERANK_ENABLED else None
+        rerank = reranker is not None and reranker.available
+        n_candidates = max(max(1, k) * 4, RERANK_CANDIDATES if rerank else 0)
+        matches = search_similar_batch(texts, k=n_candidates, memory=memory)
+        if matches is None:
+            return [[] for _ in texts]
+
+        case_sets = []
+        for text, row in zip(texts, matches):
+            row = row[(row["example_idx"] >= 0) & (row["score"] > SIMILARITY_THRESHOLD)]
+            candidates = [_example_case(int(idx), score, memory) for idx, score in row]
+            costs = np.array([_case_tokens(case) for case in candidates])
+            relevance = row["score"]
+            if rerank and candidates:
+                # Logits -> (0, 1), the same range as the cosines MMR trades them against
+                relevance = 1 / (1 + np.exp(-np.asarray(reranker.score(str(text), [c["text"] for c in candidates]))))
+            picked = mmr_select(
+                np.arange(len(row)), relevance, memory.vectors(row["example_idx"]), k,
+                mmr_lambda=SIMILAR_EXAMPLES_MMR_LAMBDA,
+                duplicate_threshold=SIMILAR_EXAMPLES_DUPLICATE_SIM,
+                costs=costs, budget=token_budget
+            )
+            case_sets.append([candidates[i] for i in picked])
+        return case_sets
 
     except Exception as e:
-        print(f"❌ Error finding similar example: {e}")
+        print(f"❌ Error finding similar examples: {e}")
+        return [[] for _ in texts]
+
 
-    return None
+def _as_case_list(similar_cases) -> list:
+    if not similar_cases:
+        return []
+    return [similar_cases] if isinstance(similar_cases, dict) else list(similar_cases)
+
+
+# Default for `similar_cases` arguments: look them up (an empty list already means "none found")
+LOOKUP_SIMILAR = object()
+
+
+def get_similar_example(new_text: str):
+    """
+    Finds the single most similar contract from the analyst memory using TF-IDF.
+    Returns the text and correct classification.
+    """
+    return get_similar_examples([new_text])[0]
 
 
 def calculate_derived_fields(financial_data: dict, geo_data: dict, description: str, contract_date_str: str) -> dict:
@@ -221,6 +350,7 @@ def calculate_derived_fields(financial_data: dict, geo_data: dict, description:
 
     return {
         "Supplier Name": financial_data.get("Supplier Name", "Unknown"),
+        "Supplier Match": financial_data.get("Supplier Match", "unresolved"),
         "Program Type": program_type,
         "Expected MRO Contract Duration (Months)": mro_duration,
         "Quantity": qty,
@@ -235,47 +365,46 @@ def calculate_derived_fields(financial_data: dict, geo_data: dict, description:
 
 
 # ==========================================
-# 2. MAIN PROCESSOR
+# 2. RECORD STAGES
 # ==========================================
-def classify_record_with_memory(description: str, contract_date_str: str) -> dict:
+TAXONOMY_KEYS = [
+    "Market Segment", "System Type (General)", "System Type (Specific)",
+    "System Name (General)", "System Name (Specific)", "System Piloting"
+]
+GEOGRAPHY_KEYS = [
+    "Customer Region", "Customer Country", "Customer Operator",
+    "Supplier Region", "Supplier Country"
+]
+FINANCIAL_KEYS = [
+    "Supplier Name", "Program Type", "Quantity", "Value Certainty",
+    "Value (Million)", "Currency", "Description Date Found"
+]
+
+
+def _render_cases(cases: list, indent: str = "") -> str:
+    lines = []
+    for n, case in enumerate(cases, 1):
+        lines.append(f"{indent}[Past Input {n}]: {str(case['text'])[:SIMILAR_EXAMPLE_CHARS]}...")
+        lines.append(f"{indent}[Past Correct Output {n}]: {json.dumps(case['classification'])}")
+    return "\n".join(lines)
+
+
+def build_taxonomy_request(description: str, similar_cases, taxonomy_format: str = None) -> tuple:
     """
-    Main entry point for processing a single row.
-    Integrates:
-    - TF-IDF Analyst Memory (Market Segment, Systems, Names, Piloting)
-    - Geography, Domestic Content, Financials
+    Builds (prompt, system message) for the taxonomy / system classification call.
+    The static instructions come first and the per-row parts (similar case,
+    input text) last, so every row shares one cacheable prompt prefix.
+    `taxonomy_format` overrides PROMPT_TAXONOMY_FORMAT (see prompt_rendering).
     """
-
-    # ✅ Reload memory each time to ensure latest upload works in Streamlit Cloud
-    # (Streamlit reruns scripts often, but this ensures consistency)
-    if vectorizer is None:
-        load_memory()
-
-    # --- A. MEMORY CLASSIFICATION ---
-    similar_case = get_similar_example(description)
-
     system_instruction = f"""
     You are a Defense Contract Analyst.
     Your goal is to extract technical data points from the "Input Text".
 
     REFERENCE TAXONOMY:
-    {TAXONOMY_STR}
+    {render_taxonomy(taxonomy_format)}
     """
 
-    user_message = f"Input Text: {description}\n\n"
-
-    if similar_case:
-        user_message += f"""
-        IMPORTANT REFERENCE - Here is a similar contract classified by a human analyst.
-        Use this as a guide for your logic:
-
-        [Past Input]: {similar_case['text'][:300]}...
-        [Past Correct Output]: {json.dumps(similar_case['classification'])}
-
-        Now, apply the same logic to the current Input Text.
-        """
-
-    user_message += """
-    --------------------------------------------------------
+    user_message = """
     REQUIREMENTS:
     1. Classify 'Market Segment', 'System Type (General)', 'System Type (Specific)' using the Taxonomy.
     2. Extract 'System Name (Specific)' (e.g., MC-130J) and 'System Name (General)' (e.g., C-130).
@@ -293,64 +422,416 @@ def classify_record_with_memory(description: str, contract_date_str: str) -> dic
         "System Name (Specific)": "...",
         "System Piloting": "..."
     }
+    --------------------------------------------------------
     """
 
-    class_result = call_llm(user_message, system_instruction)
+    cases = _as_case_list(similar_cases)
+    if cases:
+        user_message += f"""
+        IMPORTANT REFERENCE - Similar contracts classified by a human analyst.
+        Use them as a guide for your logic:
+
+{_render_cases(cases, indent="        ")}
+
+        Now, apply the same logic to the current Input Text.
+        """
+
+    user_message += f"\nInput Text: {description}\n"
+
+    return user_message, system_instruction
 
-    # --- B. GEOGRAPHY ---
-    geo_json_str = json.dumps(GEOGRAPHY_MAPPING)
 
+def build_geography_request(description: str, geography_format: str = None) -> tuple:
     geo_prompt = GEOGRAPHY_PROMPT.format(
         operators=VALID_OPERATORS,
-        geo_mapping=geo_json_str,
+        geo_mapping=render_geography(geography_format),
         text=description
     )
-    geo_result = call_llm(geo_prompt)
+    return geo_prompt, DEFAULT_SYSTEM_MESSAGE
 
-    # --- C. DOMESTIC CONTENT ---
-    cust_c = geo_result.get("Customer Country", "Unknown")
-    supp_c = geo_result.get("Supplier Country", "Unknown")
 
+def build_domestic_request(description: str, geo_result: dict) -> tuple:
     dom_prompt = DOMESTIC_CONTENT_PROMPT.format(
-        supplier_country=supp_c,
-        customer_country=cust_c,
+        supplier_country=geo_result.get("Supplier Country", "Unknown"),
+        customer_country=geo_result.get("Customer Country", "Unknown"),
         options=DOMESTIC_CONTENT_OPTIONS,
         text=description
     )
-    dom_result_raw = call_llm(dom_prompt)
+    return dom_prompt, DEFAULT_SYSTEM_MESSAGE
+
+
+def build_financial_request(description: str) -> tuple:
+    fin_prompt = FINANCIAL_PROMPT.format(
+        program_types=PROGRAM_TYPES,
+        supplier_candidates=format_supplier_candidates(description),
+        text=description
+    )
+    return fin_prompt, DEFAULT_SYSTEM_MESSAGE
+
+
+def domestic_is_forced(geo_result: dict) -> bool:
+    """
+    Same known country on both sides is always "Indigenous", whatever the LLM says.
+    """
+    cust_c = str(geo_result.get("Customer Country", "Unknown"))
+    supp_c = str(geo_result.get("Supplier Country", "Unknown"))
+    return cust_c.lower() == supp_c.lower() and cust_c != "Unknown"
+
+
+def finalize_domestic(dom_result_raw: dict, geo_result: dict) -> dict:
+    """
+    Applies the domestic content overrides on top of the raw LLM answer.
+    """
     dom_val = dom_result_raw.get("Domestic Content", "Imported")
 
-    if cust_c.lower() == supp_c.lower() and cust_c != "Unknown":
+    if domestic_is_forced(geo_result):
         dom_val = "Indigenous"
 
     if dom_val not in DOMESTIC_CONTENT_OPTIONS:
         dom_val = "Imported"
 
-    dom_result = {"Domestic Content": dom_val}
+    return {"Domestic Content": dom_val}
 
-    # --- D. FINANCIALS ---
-    fin_prompt = FINANCIAL_PROMPT.format(
-        program_types=PROGRAM_TYPES,
-        supplier_list=", ".join(SUPPLIER_LIST),
-        text=description
-    )
-    fin_result_raw = call_llm(fin_prompt)
 
-    # Strict Supplier Match
-    raw_llm_supplier = fin_result_raw.get("Supplier Name", "Unknown")
-    matched_taxonomy_name = get_best_taxonomy_match(raw_llm_supplier)
-    fin_result_raw["Supplier Name"] = matched_taxonomy_name
+def finalize_financial(fin_result_raw: dict, resolve_supplier: bool = True) -> dict:
+    """
+    Strict Supplier Match: snaps the LLM supplier onto the taxonomy name.
+    Batch callers pass resolve_supplier=False and resolve the whole column at
+    the end instead (resolve_supplier_column).
+    """
+    if resolve_supplier:
+        raw_llm_supplier = fin_result_raw.get("Supplier Name", "Unknown")
+        fin_result_raw["Supplier Name"], fin_result_raw["Supplier Match"] = SUPPLIER_RESOLVER.match(raw_llm_supplier)
+    return fin_result_raw
+
+
+def _taxonomy_stage(ctx: dict) -> dict:
+    return call_llm(*build_taxonomy_request(ctx["description"], ctx["similar_cases"]), use_cache=ctx["use_cache"])
+
+
+def _geography_stage(ctx: dict) -> dict:
+    known = confident_fields(ctx["rules"], GEOGRAPHY_KEYS)
+    if len(known) == len(GEOGRAPHY_KEYS):
+        return known
+    return {**call_llm(*build_geography_request(ctx["description"]), use_cache=ctx["use_cache"]), **known}
+
+
+def _domestic_stage(ctx: dict) -> dict:
+    geo_result = ctx["geography"]
+    if domestic_is_forced(geo_result):
+        return finalize_domestic({}, geo_result)
+    dom_result_raw = call_llm(*build_domestic_request(ctx["description"], geo_result), use_cache=ctx["use_cache"])
+    return finalize_domestic(dom_result_raw, geo_result)
+
+
+def _financial_stage(ctx: dict) -> dict:
+    fin_result_raw = call_llm(*build_financial_request(ctx["description"]), use_cache=ctx["use_cache"])
+    fin_result_raw.update(confident_fields(ctx["rules"], FINANCIAL_KEYS))
+    return finalize_financial(fin_result_raw, ctx.get("resolve_supplier", True))
+
+
+# name -> (dependencies, stage function). Only Domestic Content needs another
+# stage's output (the countries from Geography); the rest start immediately.
+RECORD_STAGES = {
+    "taxonomy": ((), _taxonomy_stage),
+    "geography": ((), _geography_stage),
+    "domestic": (("geography",), _domestic_stage),
+    "financial": ((), _financial_stage),
+}
+
+
+def run_stage_graph(stages: dict, ctx: dict) -> dict:
+    """
+    Runs a small stage DAG, starting every stage as soon as its dependencies
+    are done. Each stage receives `ctx` and its result is stored in
+    ctx[stage_name]. The first stage exception is re-raised.
+    """
+    pending = dict(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stages))) as pool:
+        while pending or running:
+            ready = [
+                name for name, (deps, _) in pending.items()
+                if all(dep in ctx for dep in deps)
+            ]
+            for name in ready:
+                _, fn = pending.pop(name)
+                running[pool.submit(fn, ctx)] = name
+
+            if not running:
+                raise ValueError(f"Unsatisfiable stage dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                ctx[name] = future.result()
 
+    return ctx
+
+
+# ==========================================
+# 3. MAIN PROCESSOR
+# ==========================================
+def merge_record_results(class_result: dict, geo_result: dict, dom_result: dict, fin_result: dict,
+                         description: str, contract_date_str: str) -> dict:
+    """
+    Builds the final row from the per-stage results (same layout for every extraction mode).
+    """
     derived_result = calculate_derived_fields(
-        fin_result_raw, geo_result, description, contract_date_str
+        fin_result, geo_result, description, contract_date_str
     )
 
-    # --- FINAL MERGE ---
-    final_output = {
+    return {
         **class_result,
         **geo_result,
         **dom_result,
         **derived_result
     }
 
-    return final_output
\ No newline at end of file
+
+def classify_record_with_memory(description: str, contract_date_str: str, header: str = "",
+                                similar_cases=LOOKUP_SIMILAR, resolve_supplier: bool = True,
+                                use_cache: bool = True) -> dict:
+    """
+    Main entry point for processing a single row.
+    Integrates:
+    - TF-IDF Analyst Memory (Market Segment, Systems, Names, Piloting)
+    - Geography, Domestic Content, Financials
+    Independent prompts run concurrently (see RECORD_STAGES), so a row costs
+    roughly two LLM round-trips instead of four. Fields the rule pre-classifier
+    reads with high confidence (see src/rule_extractor.py) override the LLM and
+    can skip the Geography and Domestic Content prompts entirely.
+    """
+
+    if similar_cases is LOOKUP_SIMILAR:
+        similar_cases = get_similar_case_sets([description])[0]
+
+    ctx = run_stage_graph(RECORD_STAGES, {
+        "description": description,
+        "similar_cases": similar_cases,
+        "rules": pre_classify(description, header),
+        "resolve_supplier": resolve_supplier,
+        "use_cache": use_cache
+    })
+
+    # --- FINAL MERGE ---
+    return merge_record_results(
+        ctx["taxonomy"], ctx["geography"], ctx["domestic"], ctx["financial"],
+        description, contract_date_str
+    )
+
+
+def _string_field(enum=None) -> dict:
+    return {"type": "string", "enum": list(enum)} if enum else {"type": "string"}
+
+
+# Structured-output schema for the one-shot prompt: every key the four-call
+# mode merges, with the closed lists (taxonomy levels included) enforced as enums.
+# Cross-level consistency is left to validate_market_system.
+CONSOLIDATED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "defense_contract_extraction",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                **{key: _string_field() for key in TAXONOMY_KEYS + GEOGRAPHY_KEYS + FINANCIAL_KEYS},
+                "Customer Operator": _string_field(VALID_OPERATORS),
+                "Domestic Content": _string_field(DOMESTIC_CONTENT_OPTIONS),
+                "Program Type": _string_field(PROGRAM_TYPES),
+                "Market Segment": _string_field(TAXONOMY.segments),
+                "System Type (General)": _string_field(sorted(TAXONOMY.general_names)),
+                "System Type (Specific)": _string_field(sorted(TAXONOMY.specific_names)),
+            },
+            "required": TAXONOMY_KEYS + GEOGRAPHY_KEYS + ["Domestic Content"] + FINANCIAL_KEYS,
+            "additionalProperties": False
+        }
+    }
+}
+
+
+def build_consolidated_request(description: str, similar_cases, taxonomy_format: str = None,
+                               geography_format: str = None) -> tuple:
+    """
+    Builds (prompt, system message) for the single consolidated extraction call.
+    """
+    _, system_instruction = build_taxonomy_request(description, None, taxonomy_format)
+
+    reference = ""
+    cases = _as_case_list(similar_cases)
+    if cases:
+        reference = (
+            "\nIMPORTANT REFERENCE - Similar contracts classified by a human analyst (system fields only):\n"
+            f"{_render_cases(cases)}\n"
+        )
+
+    prompt = CONSOLIDATED_PROMPT.format(
+        operators=VALID_OPERATORS,
+        geo_mapping=render_geography(geography_format),
+        domestic_options=DOMESTIC_CONTENT_OPTIONS,
+        program_types=PROGRAM_TYPES,
+        reference=reference,
+        text=description
+    )
+    return prompt, system_instruction
+
+
+def split_consolidated_result(raw: dict, resolve_supplier: bool = True) -> tuple:
+    """
+    Splits a one-shot answer into (taxonomy, geography, domestic, financial) stage results.
+    """
+    class_result = {k: raw[k] for k in TAXONOMY_KEYS if k in raw}
+    geo_result = {k: raw[k] for k in GEOGRAPHY_KEYS if k in raw}
+    dom_result = finalize_domestic(raw, geo_result)
+    fin_result = finalize_financial({k: raw[k] for k in FINANCIAL_KEYS if k in raw}, resolve_supplier)
+    return class_result, geo_result, dom_result, fin_result
+
+
+def classify_record_one_shot(description: str, contract_date_str: str, header: str = "",
+                             similar_cases=LOOKUP_SIMILAR, resolve_supplier: bool = True,
+                             use_cache: bool = True) -> dict:
+    """
+    Same output as classify_record_with_memory, but every field comes from a
+    single structured-output LLM call instead of four prompts.
+    """
+    if similar_cases is LOOKUP_SIMILAR:
+        similar_cases = get_similar_case_sets([description])[0]
+    raw = call_llm(
+        *build_consolidated_request(description, similar_cases),
+        use_cache=use_cache,
+        response_format=CONSOLIDATED_RESPONSE_FORMAT
+    )
+    raw.update(confident_fields(pre_classify(description, header)))
+
+    return merge_record_results(*split_consolidated_result(raw, resolve_supplier), description, contract_date_str)
+
+
+EXTRACTION_MODES = {
+    "four_call": classify_record_with_memory,
+    "one_shot": classify_record_one_shot,
+}
+
+
+def classify_record(description: str, contract_date_str: str, mode: str = None, header: str = "",
+                    similar_cases=LOOKUP_SIMILAR, resolve_supplier: bool = True, use_cache: bool = True) -> dict:
+    """
+    Classifies one row with the given extraction mode (defaults to config.EXTRACTION_MODE).
+    `header` is the scraped section header (ARMY, NAVY, ...) used by the rule pre-classifier.
+    `similar_cases` (see get_similar_case_sets) can be passed in when already retrieved in bulk.
+    With resolve_supplier=False the raw LLM supplier is kept (see resolve_supplier_column).
+    With use_cache=False cached LLM answers are not reused (fresh answers are still stored).
+    """
+    mode = mode or EXTRACTION_MODE
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}'. Choose from {list(EXTRACTION_MODES)}")
+    return EXTRACTION_MODES[mode](description, contract_date_str, header, similar_cases, resolve_supplier, use_cache)
+
+
+# ==========================================
+# 4. BATCH PROCESSOR
+# ==========================================
+def resolve_supplier_column(results: list) -> list:
+    """
+    Snaps every result's raw "Supplier Name" onto the taxonomy in one bulk
+    pass (each distinct name resolved once) and records the "Supplier Match"
+    method. Error rows are left alone; a row whose name cannot be resolved
+    becomes an error row on its own. Updates `results` in place.
+    """
+    positions = [i for i, res in enumerate(results) if res is not None and "__error__" not in res]
+    if positions:
+        resolved = resolve_suppliers([results[i].get("Supplier Name", "Unknown") for i in positions])
+        for i, (name, method, error) in zip(positions, resolved.itertuples(index=False)):
+            if error:
+                print(f"❌ Row {i + 1} supplier resolution failed: {error}")
+                results[i] = {"__error__": f"Supplier resolution failed: {error}"}
+            else:
+                results[i]["Supplier Name"], results[i]["Supplier Match"] = name, method
+    return results
+
+
+def propagate_result(result: dict, description: str, contract_date_str: str) -> dict:
+    """
+    Copies a cluster representative's classification onto a near-duplicate
+    row, re-reading the row's own value (rule extractor) and contract date.
+    A row whose text states no amount gets the defaults ("0.000", certainty
+    "Unknown"), never the representative's figure.
+    """
+    if "__error__" in result:
+        return dict(result)
+
+    row_result = dict(result)
+    try:
+        signing = pd.to_datetime(contract_date_str, dayfirst=True)
+        row_result["Signing Month"], row_result["Signing Year"] = signing.strftime("%B"), str(signing.year)
+    except Exception:
+        pass
+
+    value = pre_classify(description).get("Value (Million)")
+    if value:
+        row_result["Value (Million)"] = row_result["Value (USD$ Million)"] = value["value"]
+    else:
+        row_result["Value (Million)"] = row_result["Value (USD$ Million)"] = "0.000"
+        row_result["Value Certainty"] = "Unknown"
+    return row_result
+
+
+def classify_records(rows, max_concurrency: int = MAX_CONCURRENCY, on_progress=None, mode: str = None,
+                     dedup: bool = DEDUP_ENABLED, use_cache: bool = True) -> list:
+    """
+    Runs classify_record (four-call or one-shot, see `mode`) over many rows with bounded concurrency.
+    `rows` is an iterable of (description, contract_date_str) pairs, optionally
+    with the scraped header as a third item.
+    With `dedup`, near-duplicate descriptions (src/dedup.py) are classified
+    once and the result is propagated to the rest of their cluster.
+    `use_cache` applies to this call only (see classify_record), so callers
+    sharing the process-wide LLM cache do not affect each other.
+    Results are returned in input order. A row that raises comes back as
+    {"__error__": "<message>"} so one bad row does not sink the batch.
+    `on_progress(done, total)` is called from the calling thread.
+    """
+    rows = list(rows)
+    results = [None] * len(rows)
+    if not rows:
+        return results
+
+    representatives = cluster_near_duplicates(row[0] for row in rows) if dedup else list(range(len(rows)))
+    members = {}
+    for idx, rep in enumerate(representatives):
+        members.setdefault(rep, []).append(idx)
+    if dedup:
+        report = dedup_report(representatives)
+        print(f"🧬 Dedup: {report['rows']} rows -> {report['clusters']} to classify "
+              f"({report['reduction_ratio']:.1%} reduction)")
+
+    unique = sorted(members)
+    # One vectorized retrieval pass for the whole batch (memory is hot-reloaded
+    # in the background, see memory_snapshot)
+    case_sets = get_similar_case_sets(rows[rep][0] for rep in unique)
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_concurrency))) as pool:
+        futures = {
+            pool.submit(classify_record, rows[rep][0], rows[rep][1], mode,
+                        rows[rep][2] if len(rows[rep]) > 2 else "", cases, False, use_cache): rep
+            for rep, cases in zip(unique, case_sets)
+        }
+
+        done = 0
+        for future in as_completed(futures):
+            rep = futures[future]
+            try:
+                results[rep] = future.result()
+            except Exception as e:
+                print(f"❌ Row {rep + 1} failed: {e}")
+                results[rep] = {"__error__": str(e)}
+
+            for idx in members[rep][1:]:
+                results[idx] = propagate_result(results[rep], rows[idx][0], rows[idx][1])
+
+            done += len(members[rep])
+            if on_progress:
+                on_progress(done, len(rows))
+
+    # Supplier names are matched once per distinct raw name for the whole batch
+    return resolve_supplier_column(results)
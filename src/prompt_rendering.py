@@ -0,0 +1,122 @@
+"""
+Prompt renderings of the taxonomy and geography reference data.
+
+The taxonomy prompt used to paste TAXONOMY_STR (indented JSON with an English
+definition for every node), and the geography prompts json.dumps'ed
+GEOGRAPHY_MAPPING on every call. Both are rendered here instead, once per
+format and taxonomy version (TaxonomyModel.version):
+
+taxonomy formats
+- "verbose": TAXONOMY_STR as written (the original prompt text);
+- "names":   indented name-only tree, one line per general type;
+- "compact": the names tree plus only the definitions that help tell types
+             apart: segments, abbreviations ("AEW&C", "NBC Equipment") and
+             definitions that give examples ("e.g., V-22").
+
+geography formats
+- "verbose": json.dumps(GEOGRAPHY_MAPPING);
+- "compact": one "Region: country; country" line per region.
+
+Renderings are constant per format, so prompts keep their cacheable prefix.
+Token counts are the ~4 characters/token estimate used for rate limiting.
+"""
+import json
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+from config import PROMPT_TAXONOMY_FORMAT, PROMPT_GEOGRAPHY_FORMAT
+from data.taxonomy import TAXONOMY_STR, GEOGRAPHY_MAPPING
+from src.rate_limiter import estimate_tokens
+from src.taxonomy_model import TAXONOMY, TaxonomyModel
+
+TAXONOMY_FORMATS = ("verbose", "names", "compact")
+GEOGRAPHY_FORMATS = ("verbose", "compact")
+
+_ABBREVIATION_RE = re.compile(r"[A-Z0-9]{2,}")
+_EXAMPLE_RE = re.compile(r"\be\.g\.", re.IGNORECASE)
+
+
+def _disambiguates(name: str, definition: str) -> bool:
+    """
+    Whether a definition is worth its tokens: the name is an abbreviation,
+    or the definition gives concrete examples.
+    """
+    if not definition or name == "Not Applicable":
+        return False
+    return bool(_ABBREVIATION_RE.search(name) or _EXAMPLE_RE.search(definition))
+
+
+def _label(name: str, definition: str, with_definition: bool) -> str:
+    # Square brackets: some names already carry parentheses ("MRL (Multiple Rocket Launcher)")
+    return f"{name} [{definition.rstrip('.')}]" if with_definition else name
+
+
+def _render_tree(model: TaxonomyModel, with_definitions: bool) -> str:
+    lines = ["Market Segment" + (" [definition]" if with_definitions else ""),
+             "  System Type (General): System Type (Specific); ..."]
+    for segment in model.segments:
+        lines.append(_label(segment, model.definitions[(segment,)], with_definitions))
+        for general in model.generals(segment):
+            general_definition = model.definitions[(segment, general)]
+            specifics = [
+                _label(specific, model.definitions[(segment, general, specific)],
+                       with_definitions and _disambiguates(specific, model.definitions[(segment, general, specific)]))
+                for specific in model.specifics(segment, general)
+            ]
+            general_label = _label(general, general_definition,
+                                   with_definitions and _disambiguates(general, general_definition))
+            lines.append(f"  {general_label}: {'; '.join(specifics)}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def _taxonomy_rendering(fmt: str, version: str) -> str:
+    # `version` only keys the cache: a new TAXONOMY gets its own renderings
+    if fmt == "verbose":
+        return TAXONOMY_STR
+    if fmt == "names":
+        return _render_tree(TAXONOMY, with_definitions=False)
+    if fmt == "compact":
+        return _render_tree(TAXONOMY, with_definitions=True)
+    raise ValueError(f"Unknown taxonomy prompt format '{fmt}' (expected one of {TAXONOMY_FORMATS})")
+
+
+@lru_cache(maxsize=None)
+def _geography_rendering(fmt: str) -> str:
+    if fmt == "verbose":
+        return json.dumps(GEOGRAPHY_MAPPING)
+    if fmt == "compact":
+        return "\n".join(f"{region}: {'; '.join(countries)}" for region, countries in GEOGRAPHY_MAPPING.items())
+    raise ValueError(f"Unknown geography prompt format '{fmt}' (expected one of {GEOGRAPHY_FORMATS})")
+
+
+def render_taxonomy(fmt: str = None) -> str:
+    return _taxonomy_rendering(fmt or PROMPT_TAXONOMY_FORMAT, TAXONOMY.version)
+
+
+def render_geography(fmt: str = None) -> str:
+    return _geography_rendering(fmt or PROMPT_GEOGRAPHY_FORMAT)
+
+
+def rendering_report() -> pd.DataFrame:
+    """
+    Characters and estimated tokens of every rendering, with the saving
+    against the verbose form.
+    """
+    records = []
+    for data, formats, render in (("taxonomy", TAXONOMY_FORMATS, render_taxonomy),
+                                  ("geography", GEOGRAPHY_FORMATS, render_geography)):
+        verbose_tokens = estimate_tokens(render("verbose"))
+        for fmt in formats:
+            text = render(fmt)
+            tokens = estimate_tokens(text)
+            records.append({
+                "Data": data,
+                "Format": fmt,
+                "Chars": len(text),
+                "Est. Tokens": tokens,
+                "Saving": round(1 - tokens / verbose_tokens, 4)
+            })
+    return pd.DataFrame(records)
@@ -1,3 +1,7 @@
+# NOTE ON LAYOUT: every prompt keeps its large static parts (taxonomy, mapping,
+# examples, rules, output format) first and the per-row values last, so all rows
+# share a byte-identical prefix that provider-side prompt caching can reuse.
+
 # ==============================================================================
 # 1. MARKET STRUCTURE PROMPT (Strict Hierarchy)
 # ==============================================================================
@@ -245,6 +249,9 @@ Return JSON ONLY:
   "Description Date Found": "..."
 }}
 
+Candidate Suppliers (taxonomy names that overlap this description; prefer one of these if it is the awarded entity):
+{supplier_candidates}
+
 Description:
 \"\"\"
 {text}
@@ -301,10 +308,6 @@ STRICT DEFINITIONS:
 3. Local Assembly: Components manufactured abroad, imported, and assembled locally (CKD/SKD).
 4. License Production: Local company manufactures a foreign product under a licensing agreement.
 
-INPUT CONTEXT:
-- Supplier Country: {supplier_country}
-- Customer Country: {customer_country}
-
 OPTIONS:
 {options}
 
@@ -313,8 +316,81 @@ Return JSON ONLY:
   "Domestic Content": "..."
 }}
 
+INPUT CONTEXT:
+- Supplier Country: {supplier_country}
+- Customer Country: {customer_country}
+
+Description:
+\"\"\"
+{text}
+\"\"\"
+"""
+
+# ==============================================================================
+# 5. CONSOLIDATED (ONE-SHOT) PROMPT
+# ==============================================================================
+# Covers the taxonomy, geography, domestic content and financial prompts in a
+# single request. Used when EXTRACTION_MODE = "one_shot".
+CONSOLIDATED_PROMPT = """
+You are a defence contract analyst.
+YOUR TASK: Extract ALL of the fields below from the description in ONE JSON object.
+
+A. SYSTEM CLASSIFICATION (use the Reference Taxonomy from the system message):
+1. Classify 'Market Segment', 'System Type (General)', 'System Type (Specific)'. A child level must belong to the chosen parent.
+2. Extract 'System Name (Specific)' (e.g., MC-130J) and 'System Name (General)' (e.g., C-130).
+3. 'System Piloting': Software/Services/Ammo/Infra = "Not Applicable"; Manned Vehicles = "Crewed"; Drones/Satellites = "Uncrewed".
+
+B. GEOGRAPHY:
+1. **Supplier Country**: The country where the supplier company is BASED (not necessarily HQ).
+2. If a country buys equipment UNILATERALLY for Ukraine -> Customer: [Purchasing Country], Operator: "Ukraine (Assistance)".
+3. **Customer Operator**: pick one value from this list ONLY: {operators}
+   - "Naval Information Warfare Center" -> "Navy"; "Air Force Life Cycle Management Center" -> "Air Force".
+4. Regions and countries must come from this MAPPING:
+{geo_mapping}
+
+C. DOMESTIC CONTENT (CHOOSE ONE OF {domestic_options}):
+- Imported: Product originates from a different country and is physically imported.
+- Indigenous: Product is produced within the customer's country (INCLUDES local subsidiaries of a foreign company).
+- Local Assembly: Components manufactured abroad, imported, and assembled locally (CKD/SKD).
+- License Production: Local company manufactures a foreign product under a licensing agreement.
+
+D. FINANCIALS:
+""" + GOLD_STANDARD_EXAMPLES + """
+1. **Program Type** (CHOOSE EXACTLY ONE OF {program_types}):
+   - Training = training *services*; Procurement = new products/systems, including work on test articles or prototypes;
+     MRO/Support = sustainment of existing, fielded equipment only; RDT&E = research/prototyping/testing;
+     Upgrade = modernizing existing equipment; Other Service = consulting/IT/services not tied to a weapon system.
+2. **Supplier Name**: the entity AWARDED the contract, as a Clean Brand Name (no "Inc", "LLC", "Corp" or locations).
+3. **Quantity**: hardware = total count (SUM multiple lines); services/RDT&E/IT = "Not Applicable"; hardware without a number = "Unknown".
+4. **Value (Million)**: convert to MILLIONS, 3 decimals, no currency symbols (e.g. $2,493,000,000 -> "2493.000").
+5. **Value Certainty**: "Confirmed" by default (including ceilings/estimated values of signed agreements); "Estimated" only for potential/projected values.
+6. **Description Date Found**: for MRO contracts, the completion date. Otherwise leave empty.
+
+Return JSON ONLY with exactly these keys:
+{{
+  "Market Segment": "...",
+  "System Type (General)": "...",
+  "System Type (Specific)": "...",
+  "System Name (General)": "...",
+  "System Name (Specific)": "...",
+  "System Piloting": "...",
+  "Customer Region": "...",
+  "Customer Country": "...",
+  "Customer Operator": "...",
+  "Supplier Region": "...",
+  "Supplier Country": "...",
+  "Domestic Content": "...",
+  "Supplier Name": "...",
+  "Program Type": "...",
+  "Quantity": "...",
+  "Value Certainty": "...",
+  "Value (Million)": "...",
+  "Currency": "...",
+  "Description Date Found": "..."
+}}
+{reference}
 Description:
 \"\"\"
 {text}
 \"\"\"
-"""
\ No newline at end of file
+"""
@@ -0,0 +1,185 @@
+import email.utils
+import random
+import threading
+import time
+
+from config import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS
+)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` units and refills
+    continuously at capacity / 60 units per second (a per-minute budget).
+    Not thread-safe on its own; RateLimiter serializes access.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._last = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` units are available (0 if they are available now).
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else LLM_BACKOFF_MAX_SECONDS
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def set_capacity(self, per_minute: float):
+        self._refill()
+        self.capacity = float(per_minute)
+        self.level = min(self.level, self.capacity)
+
+    def cap_level(self, remaining: float):
+        """
+        Never believe we have more budget than the provider says is left.
+        """
+        self._refill()
+        self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """
+    Request + token per-minute limiter shared by every call_llm worker.
+    Starts from the configured budgets and then follows the provider's
+    x-ratelimit-* response headers, so throughput tracks the real ceiling.
+    `sent` counts the requests let through (one per network attempt, retries included).
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self.sent = 0
+
+    def acquire(self, tokens: int = 1):
+        """
+        Blocks until one request and `tokens` tokens fit in the budget, then spends them.
+        """
+        while True:
+            with self._lock:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(min(tokens, self.tokens.capacity))
+                    self.sent += 1
+                    return
+            time.sleep(min(wait, LLM_BACKOFF_MAX_SECONDS))
+
+    def adjust_tokens(self, delta: int):
+        """
+        Corrects the token bucket once the real usage of a request is known.
+        """
+        with self._lock:
+            self.tokens.take(delta)
+
+    def update_from_headers(self, headers):
+        """
+        Learns limits from OpenAI-style headers:
+        x-ratelimit-limit-{requests,tokens} and x-ratelimit-remaining-{requests,tokens}.
+        """
+        if not headers:
+            return
+
+        with self._lock:
+            for name, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                limit = _to_float(headers.get(f"x-ratelimit-limit-{name}"))
+                if limit and limit > 0 and limit != bucket.capacity:
+                    bucket.set_capacity(limit)
+
+                remaining = _to_float(headers.get(f"x-ratelimit-remaining-{name}"))
+                if remaining is not None:
+                    bucket.cap_level(remaining)
+
+    def pause(self, seconds: float):
+        """
+        Drains both buckets so every worker backs off (used after a 429).
+        """
+        with self._lock:
+            self.requests.cap_level(-seconds * self.requests.rate)
+            self.tokens.cap_level(-seconds * self.tokens.rate)
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(headers):
+    """
+    Reads retry-after-ms / retry-after (seconds or HTTP date) from response headers.
+    """
+    if not headers:
+        return None
+
+    retry_ms = _to_float(headers.get("retry-after-ms"))
+    if retry_ms is not None:
+        return retry_ms / 1000.0
+
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+
+    seconds = _to_float(retry_after)
+    if seconds is not None:
+        return seconds
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """
+    Exponential backoff with full jitter; a server-provided Retry-After is a floor.
+    """
+    ceiling = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, LLM_BACKOFF_MAX_SECONDS))
+    return delay
+
+
+def estimate_tokens(*texts) -> int:
+    """
+    Cheap token estimate (~4 characters per token) for budgeting before the call.
+    """
+    return max(1, sum(len(t or "") for t in texts) // 4)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Process-wide limiter (created on first use).
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,163 @@
+"""
+Optional cross-encoder re-ranking of retrieved memory examples.
+
+TF-IDF finds examples that share words with a description; the MiniLM
+cross-encoder in RERANKER_MODEL_DIR reads (description, example) together and
+scores actual relevance. It only re-orders the top RERANK_CANDIDATES TF-IDF
+hits, so CPU cost per row stays bounded.
+
+Inference is CPU-only and offline (local files only):
+- pairs are sorted by length and packed into batches of at most
+  RERANK_BATCH_TOKENS padded tokens (dynamic batching), each padded only to
+  its own longest pair;
+- torch uses at most RERANK_THREADS threads;
+- with RERANK_QUANTIZE the Linear layers run as dynamic int8.
+
+torch/transformers are optional: if they, or the model weights, are missing,
+the reranker reports itself unavailable and callers keep the TF-IDF order.
+"""
+import os
+import threading
+import time
+
+from config import (
+    RERANKER_MODEL_DIR, RERANK_BATCH_TOKENS, RERANK_MAX_BATCH, RERANK_MAX_LENGTH,
+    RERANK_THREADS, RERANK_QUANTIZE
+)
+
+try:
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+except ImportError:  # optional
+    torch = None
+
+WEIGHT_FILES = ("model.safetensors", "pytorch_model.bin")
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_dir: str = RERANKER_MODEL_DIR, batch_tokens: int = RERANK_BATCH_TOKENS,
+                 max_batch: int = RERANK_MAX_BATCH, max_length: int = RERANK_MAX_LENGTH,
+                 threads: int = RERANK_THREADS, quantize: bool = RERANK_QUANTIZE):
+        self.model_dir = model_dir
+        self.batch_tokens = batch_tokens
+        self.max_batch = max_batch
+        self.max_length = max_length
+        self.threads = threads
+        self.quantize = quantize
+
+        self.tokenizer = None
+        self.model = None
+        self.unavailable_reason = None
+        self._lock = threading.Lock()
+
+    # ---------- loading ----------
+    def _load(self):
+        if self.model is not None or self.unavailable_reason:
+            return
+        if torch is None:
+            self.unavailable_reason = "torch/transformers not installed"
+        elif not any(os.path.exists(os.path.join(self.model_dir, f)) for f in WEIGHT_FILES):
+            self.unavailable_reason = f"no model weights in '{self.model_dir}'"
+        else:
+            try:
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True)
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_dir, local_files_only=True)
+                model.eval()
+                if self.quantize:
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                self.model = model
+                print(f"✅ Cross-encoder loaded from '{self.model_dir}' ({'int8' if self.quantize else 'fp32'})")
+            except Exception as e:
+                self.unavailable_reason = f"could not load '{self.model_dir}': {e}"
+
+        if self.unavailable_reason:
+            print(f"⚠️ Re-ranking disabled: {self.unavailable_reason}")
+
+    @property
+    def available(self) -> bool:
+        with self._lock:
+            self._load()
+        return self.model is not None
+
+    # ---------- scoring ----------
+    def _batches(self, lengths: list) -> list:
+        """
+        Pair indices grouped into batches, shortest first, where
+        batch size x longest pair <= batch_tokens (and <= max_batch pairs).
+        """
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batches, current, longest = [], [], 0
+        for i in order:
+            longest_if_added = max(longest, lengths[i])
+            if current and (longest_if_added * (len(current) + 1) > self.batch_tokens or len(current) >= self.max_batch):
+                batches.append(current)
+                current, longest_if_added = [], lengths[i]
+            current.append(i)
+            longest = longest_if_added
+        if current:
+            batches.append(current)
+        return batches
+
+    def score(self, query: str, texts: list) -> list:
+        """
+        Relevance score for every (query, text) pair, in input order.
+        Raises RuntimeError when the model is unavailable.
+        """
+        if not self.available:
+            raise RuntimeError(f"Cross-encoder unavailable: {self.unavailable_reason}")
+        if not texts:
+            return []
+
+        encoded = self.tokenizer([query] * len(texts), [str(t) for t in texts],
+                                 truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        scores = [0.0] * len(texts)
+
+        with self._lock:
+            torch.set_num_threads(self.threads)
+            with torch.inference_mode():
+                for batch in self._batches(lengths):
+                    features = self.tokenizer.pad(
+                        {key: [encoded[key][i] for i in batch] for key in encoded.keys()},
+                        return_tensors="pt"
+                    )
+                    logits = self.model(**features).logits.view(-1).tolist()
+                    for i, logit in zip(batch, logits):
+                        scores[i] = logit
+        return scores
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """
+    Process-wide reranker (the model is loaded once, on first use).
+    """
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker()
+        return _reranker
+
+
+def benchmark_reranker(pairs: list, configs: list) -> list:
+    """
+    ms per (query, candidates) row for each reranker config, e.g.
+    [{"quantize": False}, {"quantize": True, "batch_tokens": 4096}].
+    `pairs` is a list of (query, [candidate texts]).
+    """
+    results = []
+    for config in configs:
+        reranker = CrossEncoderReranker(**config)
+        if not reranker.available:
+            results.append({**config, "ms/row": None, "note": reranker.unavailable_reason})
+            continue
+        reranker.score(*pairs[0])  # warm-up
+        start = time.perf_counter()
+        for query, texts in pairs:
+            reranker.score(query, texts)
+        elapsed = (time.perf_counter() - start) * 1000 / len(pairs)
+        results.append({**config, "ms/row": round(elapsed, 2), "note": ""})
+    return results
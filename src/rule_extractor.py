@@ -0,0 +1,182 @@
+"""
+Deterministic pre-classifier for formulaic DoD contract announcements.
+
+Most paragraphs follow "X Corp., City, State, is awarded a $N ... contract",
+published under an agency header (ARMY, NAVY, AIR FORCE, ...). Those parts are
+read here with regexes, each with a confidence score; only fields below
+RULE_CONFIDENCE_THRESHOLD are left to the LLM.
+"""
+import re
+
+from config import RULE_PRECLASSIFIER_ENABLED, RULE_CONFIDENCE_THRESHOLD
+from data.taxonomy import GEOGRAPHY_MAPPING, SUPPLIER_LIST
+
+US_STATES = {
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+    "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky",
+    "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota", "Mississippi",
+    "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey", "New Mexico",
+    "New York", "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon", "Pennsylvania",
+    "Rhode Island", "South Carolina", "South Dakota", "Tennessee", "Texas", "Utah", "Vermont",
+    "Virginia", "Washington", "West Virginia", "Wisconsin", "Wyoming",
+    "District of Columbia", "D.C.", "Washington, D.C."
+}
+
+# Scraped section header -> Customer Operator. Anything else (e.g. SPACE FORCE,
+# "CONTRACTS FOR ...") is left to the LLM.
+HEADER_OPERATORS = {
+    "ARMY": "Army",
+    "NAVY": "Navy",
+    "AIR FORCE": "Air Force",
+}
+DEFENSE_WIDE_HEADER = re.compile(r"\b(AGENCY|COMMAND|HEADQUARTERS SERVICES|DEFENSE HEALTH|UNIFORMED SERVICES)\b")
+
+# Contracting activity -> Customer Operator (weaker evidence than the header)
+ACTIVITY_OPERATORS = [
+    (re.compile(r"\b(Navy|Naval|Marine Corps)\b"), "Navy"),
+    (re.compile(r"\bArmy\b"), "Army"),
+    (re.compile(r"\bAir Force\b"), "Air Force"),
+    (re.compile(r"\b(Defense Logistics Agency|Defense Information Systems Agency|Missile Defense Agency|Defense Health Agency|Special Operations Command|Washington Headquarters Services)\b"), "Defense Wide"),
+]
+
+# Hints that the buyer is not (only) the US: leave customer fields to the LLM
+FOREIGN_CUSTOMER_HINTS = re.compile(
+    r"foreign military sales?|\bFMS\b|ukrain|on behalf of the (government|governments) of|allies|partner nations?",
+    re.IGNORECASE
+)
+
+LEGAL_SUFFIX = r"(?:,?\s*(?:Inc|LLC|L\.L\.C|Ltd|Corp|Co|Corporation|Company|LP|PLC)\.?)"
+
+# "<Supplier>, <City>, <State or Country>[ (contract no.)], is/has been/was awarded"
+LEAD_CLAUSE = re.compile(
+    r"^\s*(?P<name>[^;]+?" + LEGAL_SUFFIX + r"?(?:\s*[–-]\s*[^,;]+)?),\s*"
+    r"(?P<city>[A-Z][^,;()]*?),\s*(?P<place>(?:Washington, D\.C\.)|[A-Z][A-Za-z .'-]*?)"
+    r"(?:\s*\([^)]*\))?,?\s+(?:is being|has been|is|was)\s+awarded\b"
+)
+
+# Several awardees share one paragraph (checked on the text before the first "awarded")
+MULTIPLE_AWARDEES = re.compile(r";|\b(are|were|have|have been|each)\s*$")
+
+MONEY = r"\$\s?(?P<amount>\d[\d,]*(?:\.\d+)?)(?:\s*(?P<scale>million|billion))?"
+AWARD_VALUE = re.compile(
+    r"awarded\s+(?:an?\s+)?(?:(?:not-to-exceed|maximum|estimated|combined|ceiling|firm-fixed-price)\s+)*" + MONEY,
+    re.IGNORECASE
+)
+ANY_VALUE = re.compile(MONEY, re.IGNORECASE)
+
+_COUNTRY_REGIONS = {
+    country: region for region, countries in GEOGRAPHY_MAPPING.items()
+    if region != "Unknown" for country in countries
+}
+_SUPPLIER_NAMES = {name.casefold() for name in SUPPLIER_LIST}
+
+
+def _field(value, confidence: float) -> dict:
+    return {"value": value, "confidence": round(confidence, 2)}
+
+
+def _value_in_millions(match) -> str:
+    amount = float(match.group("amount").replace(",", ""))
+    scale = (match.group("scale") or "").lower()
+    if scale == "billion":
+        amount *= 1000
+    elif scale != "million":
+        amount /= 1_000_000
+    return "{:.3f}".format(amount)
+
+
+def _clean_supplier(name: str) -> str:
+    name = re.sub(r"\s*[–-]\s*.*$", "", name) if " – " in name or " - " in name else name
+    name = re.sub(LEGAL_SUFFIX + r"$", "", name.strip())
+    return name.strip(" ,.")
+
+
+def _country_of(place: str):
+    if place in US_STATES:
+        return "USA"
+    if place in _COUNTRY_REGIONS:
+        return place
+    return None
+
+
+def _operator_from_header(header: str):
+    header = str(header or "").strip().upper()
+    if header in HEADER_OPERATORS:
+        return HEADER_OPERATORS[header]
+    if header and DEFENSE_WIDE_HEADER.search(header):
+        return "Defense Wide"
+    return None
+
+
+def _operator_from_activity(description: str):
+    activity = re.search(r"([^.]*)\bis the contracting activity", description)
+    if not activity:
+        return None
+    for pattern, operator in ACTIVITY_OPERATORS:
+        if pattern.search(activity.group(1)):
+            return operator
+    return None
+
+
+def pre_classify(description: str, header: str = "") -> dict:
+    """
+    field -> {"value": ..., "confidence": 0..1} for the fields the rules can read.
+    Fields the rules cannot see at all are simply absent.
+    """
+    if not RULE_PRECLASSIFIER_ENABLED:
+        return {}
+
+    text = str(description or "")
+    rules = {}
+    multiple = bool(MULTIPLE_AWARDEES.search(text.split("awarded", 1)[0]))
+
+    # --- Value ---
+    award = AWARD_VALUE.search(text)
+    if award:
+        rules["Value (Million)"] = _field(_value_in_millions(award), 0.95)
+    else:
+        first = ANY_VALUE.search(text)
+        if first:
+            rules["Value (Million)"] = _field(_value_in_millions(first), 0.6)
+
+    # --- Supplier + Supplier Country ---
+    lead = LEAD_CLAUSE.match(text.replace("*", ""))  # "*" marks small businesses
+    if lead and len(lead.group("name")) <= 120:
+        name = _clean_supplier(lead.group("name"))
+        known_name = name.casefold() in _SUPPLIER_NAMES
+        rules["Supplier Name"] = _field(name, 0.5 if multiple else (0.95 if known_name else 0.75))
+
+        country = _country_of(lead.group("place").strip())
+        if country:
+            confidence = 0.7 if multiple else 0.95
+            rules["Supplier Country"] = _field(country, confidence)
+            rules["Supplier Region"] = _field("North America" if country == "USA" else _COUNTRY_REGIONS[country], confidence)
+
+    # --- Customer (US DoD announcements, unless the text hints at a foreign buyer) ---
+    header_op = _operator_from_header(header)
+    activity_op = _operator_from_activity(text)
+    if header_op and activity_op and header_op != activity_op:
+        operator, confidence = header_op, 0.6
+    elif header_op:
+        operator, confidence = header_op, 0.95
+    else:
+        operator, confidence = activity_op, 0.8
+
+    if operator:
+        if FOREIGN_CUSTOMER_HINTS.search(text):
+            confidence = min(confidence, 0.5)
+        rules["Customer Operator"] = _field(operator, confidence)
+        rules["Customer Country"] = _field("USA", confidence)
+        rules["Customer Region"] = _field("North America", confidence)
+
+    return rules
+
+
+def confident_fields(rules: dict, keys=None, threshold: float = RULE_CONFIDENCE_THRESHOLD) -> dict:
+    """
+    field -> value for the rule results at or above `threshold` (optionally limited to `keys`).
+    """
+    return {
+        key: item["value"] for key, item in rules.items()
+        if item["confidence"] >= threshold and (keys is None or key in keys)
+    }
@@ -0,0 +1,413 @@
+"""
+Supplier candidate shortlisting.
+
+FINANCIAL_PROMPT only needs the handful of taxonomy supplier names that could
+plausibly be the awardee of a given paragraph. Names are scored by lexical
+overlap with the description, weighting each name token by its IDF across
+SUPPLIER_LIST so that distinctive tokens ("Palantir", "Raytheon") count for
+far more than generic ones ("Systems", "Defense"). Suppliers the paragraph
+names outright (SupplierScanner below) always come first.
+get_best_taxonomy_match still reconciles whatever the LLM answers afterwards
+(SupplierResolver below).
+"""
+import difflib
+import math
+import re
+from collections import defaultdict, deque, namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config import SUPPLIER_SHORTLIST_SIZE
+from data.taxonomy import SUPPLIER_LIST, SUPPLIER_ALIASES
+
+# Legal suffixes and filler that say nothing about which company it is
+SUPPLIER_STOPWORDS = {
+    "the", "of", "and", "for", "a", "an", "at", "in", "on", "to", "by", "is", "as", "or",
+    "inc", "llc", "ltd", "co", "corp", "corporation", "company", "group",
+    "plc", "gmbh", "sa", "ag", "lp", "limited", "pty", "usa", "us"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> set:
+    return {t for t in _TOKEN_RE.findall(str(text).lower()) if t not in SUPPLIER_STOPWORDS and len(t) > 1}
+
+
+def _build_index(names: list) -> tuple:
+    """
+    Returns (name tokens per supplier, token -> supplier indices, token -> idf).
+    """
+    name_tokens = [_tokens(name) for name in names]
+    postings = defaultdict(list)
+    for idx, tokens in enumerate(name_tokens):
+        for token in tokens:
+            postings[token].append(idx)
+
+    n = len(names)
+    idf = {token: math.log(1 + n / len(ids)) for token, ids in postings.items()}
+    return name_tokens, dict(postings), idf
+
+
+_NAME_TOKENS, _POSTINGS, _IDF = _build_index(SUPPLIER_LIST)
+
+
+def shortlist_suppliers(description: str, top_n: int = SUPPLIER_SHORTLIST_SIZE) -> list:
+    """
+    Top-N taxonomy supplier names for a description, best first.
+    Suppliers named in the text come first, in order of appearance. The rest
+    are ranked by the IDF mass of their tokens found in the text, scaled by
+    the share of the name that was found (so "Lockheed Martin" beats "Martin UK").
+    """
+    shortlist = SUPPLIER_SCANNER.mentioned_suppliers(description)[:top_n]
+    if len(shortlist) >= top_n:
+        return shortlist
+
+    text_tokens = _tokens(description)
+
+    matched = defaultdict(float)
+    for token in text_tokens:
+        for idx in _POSTINGS.get(token, ()):
+            matched[idx] += _IDF[token]
+
+    scored = []
+    for idx, mass in matched.items():
+        total = sum(_IDF[t] for t in _NAME_TOKENS[idx])
+        scored.append((mass * (mass / total), idx))
+
+    scored.sort(key=lambda item: (-item[0], SUPPLIER_LIST[item[1]]))
+    for _, idx in scored:
+        if len(shortlist) >= top_n:
+            break
+        if SUPPLIER_LIST[idx] not in shortlist:
+            shortlist.append(SUPPLIER_LIST[idx])
+    return shortlist
+
+
+def format_supplier_candidates(description: str, top_n: int = SUPPLIER_SHORTLIST_SIZE) -> str:
+    """
+    Prompt-ready rendering of the shortlist ("None" when nothing overlaps).
+    """
+    candidates = shortlist_suppliers(description, top_n)
+    return ", ".join(candidates) if candidates else "None"
+
+
+# ==========================================
+# SUPPLIER MENTIONS
+# ==========================================
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: a trie of all patterns plus failure links,
+    so every occurrence of every pattern is found in one pass over the text,
+    whatever the number of patterns.
+    """
+
+    def __init__(self, patterns: list):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.out = [()]
+        for idx, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.out.append(())
+                state = nxt
+            self.out[state] += (idx,)
+
+        # Failure link = longest proper suffix that is also a trie path (breadth first)
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def finditer(self, text: str):
+        """
+        Yields (start, end, pattern index) for every occurrence, overlapping ones included.
+        """
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                yield i + 1 - len(patterns[idx]), i + 1, idx
+
+
+SupplierMention = namedtuple("SupplierMention", ["start", "end", "surface", "supplier"])
+
+# SUPPLIER_LIST placeholders that are not company names
+NON_SUPPLIER_NAMES = {"Unknown", "Multiple", "Generic Supplier", "Out of Business", "Second-Hand", "GFE"}
+
+
+class SupplierScanner:
+    """
+    Finds the taxonomy suppliers a paragraph names, directly or through
+    SUPPLIER_ALIASES, with one Aho-Corasick pass over the lowercased text.
+
+    A hit must be a whole word sequence. Acronyms ("SAIC", "KBR") must match
+    case exactly and stand alone, and other names must not start on a lowercase letter, so
+    ordinary words ("spectra", "zenith") are not taken for company names.
+    """
+
+    def __init__(self, names: list, aliases: dict):
+        surfaces = {}  # lowercase pattern -> (written form, taxonomy name)
+        for name in names:
+            if name not in NON_SUPPLIER_NAMES:
+                surfaces.setdefault(name.strip(" ,").lower(), (name.strip(" ,"), name))
+        known = set(names)
+        for alias, name in aliases.items():
+            if name in known:
+                surfaces[alias.lower()] = (alias, name)
+
+        self.patterns = list(surfaces)
+        self.written = [surfaces[p][0] for p in self.patterns]
+        self.suppliers = [surfaces[p][1] for p in self.patterns]
+        self.acronym = [w.isupper() and len(w) <= 5 for w in self.written]
+        self.automaton = AhoCorasick(self.patterns)
+
+    def _accept(self, text: str, start: int, end: int, idx: int) -> bool:
+        if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+            return False
+        if self.acronym[idx]:
+            # "PAC-3", "BAMS-D" are program designations, not the companies
+            return text[start:end] == self.written[idx] and "-" not in (text[start - 1:start], text[end:end + 1])
+        return not (text[start].islower() and not self.written[idx][0].islower())
+
+    def scan(self, text: str) -> list:
+        """
+        SupplierMention per mention, left to right. Overlapping hits keep the
+        leftmost, then longest ("General Dynamics Electric Boat", not "General Dynamics").
+        """
+        text = str(text or "")
+        lowered = text.lower()
+        if len(lowered) != len(text):  # a few characters lowercase to two; keep offsets aligned
+            lowered = "".join(ch.lower()[:1] for ch in text)
+        hits = [
+            (start, -end, idx) for start, end, idx in self.automaton.finditer(lowered)
+            if self._accept(text, start, end, idx)
+        ]
+        mentions, covered = [], 0
+        for start, neg_end, idx in sorted(hits):
+            if start >= covered:
+                mentions.append(SupplierMention(start, -neg_end, text[start:-neg_end], self.suppliers[idx]))
+                covered = -neg_end
+        return mentions
+
+    def mentioned_suppliers(self, text: str) -> list:
+        """
+        Distinct taxonomy names mentioned in `text`, in order of first mention.
+        """
+        return list(dict.fromkeys(m.supplier for m in self.scan(text)))
+
+
+SUPPLIER_SCANNER = SupplierScanner(SUPPLIER_LIST, SUPPLIER_ALIASES)
+
+
+# ==========================================
+# SUPPLIER NAME RESOLUTION
+# ==========================================
+def supplier_name_text(value) -> str:
+    """
+    LLM "Supplier Name" as a string: None/NaN/blank -> "Unknown", lists are
+    joined, numbers and other values go through str().
+    """
+    if isinstance(value, str):
+        return value if value.strip() else "Unknown"
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "Unknown"
+    if isinstance(value, (list, tuple)):
+        return supplier_name_text(", ".join(str(v) for v in value if v is not None))
+    return supplier_name_text(str(value))
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SupplierResolver:
+    """
+    Maps a free-text supplier name onto the taxonomy, with the same answers
+    as the original linear passes (exact -> brand-filtered fuzzy -> global
+    fuzzy -> substring), but driven by prebuilt indexes:
+
+    - casefolded exact-match dict;
+    - character-trigram postings over the lowercased names, to find names
+      containing a word (brand filter);
+    - an Aho-Corasick automaton over the lowercased names, finding every name
+      contained in the input in one pass (substring pass);
+    - a per-name character-count matrix, giving difflib's quick_ratio (an upper
+      bound of its ratio) for every name in one vectorized step, so the full
+      ratio is only computed for the few names that could still win.
+    """
+
+    def __init__(self, names: list):
+        # Longest first, as the linear passes preferred the most specific name
+        self.names = sorted(names, key=len, reverse=True)
+        self.lower = [name.lower() for name in self.names]
+
+        self.exact = {}
+        for name, lower in zip(self.names, self.lower):
+            self.exact.setdefault(lower, name)
+
+        postings = defaultdict(list)
+        for pos, lower in enumerate(self.lower):
+            for gram in _trigrams(lower):
+                postings[gram].append(pos)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.automaton = AhoCorasick(self.lower)
+
+        alphabet = sorted({ch for name in self.names for ch in name})
+        self.char_ids = {ch: i for i, ch in enumerate(alphabet)}
+        # Column-major: a query only reads the columns of its own characters
+        self.char_counts = np.zeros((len(self.names), len(alphabet)), dtype=np.int16, order="F")
+        for pos, name in enumerate(self.names):
+            for ch in name:
+                self.char_counts[pos, self.char_ids[ch]] += 1
+        self.lengths = np.array([len(name) for name in self.names], dtype=np.float64)
+
+        self._containing = lru_cache(maxsize=4096)(self._names_containing)
+        # LLM answers repeat the same few suppliers across a batch
+        self._cached_match = lru_cache(maxsize=8192)(self._match)
+
+    # ---------- candidate generation ----------
+    def _names_containing(self, word: str) -> np.ndarray:
+        """
+        Positions (ascending) of names whose lowercase form contains `word`.
+        """
+        if len(word) < 3:
+            return np.array([pos for pos, lower in enumerate(self.lower) if word in lower], dtype=np.int32)
+        hits = None
+        for gram in _trigrams(word):
+            ids = self.postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            hits = ids if hits is None else np.intersect1d(hits, ids, assume_unique=True)
+        return np.array([pos for pos in hits if word in self.lower[pos]], dtype=np.int32)
+
+    def _first_contained_name(self, text_lower: str):
+        """
+        The longest name whose lowercase form occurs in `text_lower`, or None.
+        """
+        # Names are stored longest first, so the lowest position is the longest name
+        pos = min((idx for _, _, idx in self.automaton.finditer(text_lower)), default=None)
+        return None if pos is None else self.names[pos]
+
+    def _close_match(self, name: str, positions, cutoff: float):
+        """
+        Same answer as difflib.get_close_matches(name, names[positions], n=1, cutoff).
+        Names are visited best quick_ratio first (an upper bound of ratio);
+        once the bound drops below the best ratio found, no later name can win.
+        """
+        if len(positions) == 0:
+            return None
+
+        query = defaultdict(int)
+        for ch in name:
+            if ch in self.char_ids:
+                query[self.char_ids[ch]] += 1
+        cols, counts = list(query), np.array(list(query.values()), dtype=np.int16)
+
+        # quick_ratio for every candidate, reading only the query's character columns
+        char_counts = self.char_counts[:, cols] if len(positions) == len(self.names) else self.char_counts[positions][:, cols]
+        common = np.minimum(char_counts, counts).sum(axis=1)
+        quick = 2.0 * common / (self.lengths[positions] + len(name))
+        keep = quick >= cutoff - 1e-9
+        positions, quick = positions[keep], quick[keep]
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(name)
+        best = None  # (ratio, name): get_close_matches breaks ties on the larger string
+        for i in np.argsort(-quick, kind="stable"):
+            if best is not None and quick[i] < best[0] - 1e-9:
+                break
+            candidate = self.names[positions[i]]
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff and (best is None or (ratio, candidate) > best):
+                    best = (ratio, candidate)
+        return best[1] if best else None
+
+    # ---------- resolution ----------
+    def _match(self, extracted_name: str) -> tuple:
+        """
+        (taxonomy name, match method); method is one of MATCH_METHODS.
+        """
+        if not extracted_name or extracted_name.lower() in ["unknown", "not applicable", "multiple"]:
+            return "Unknown", "unknown"
+
+        clean_name = extracted_name.strip()
+        clean_name_lower = clean_name.lower()
+
+        # Exact Match
+        if clean_name_lower in self.exact:
+            return self.exact[clean_name_lower], "exact"
+
+        # Brand Name Filtering (names containing the first word)
+        first_word = clean_name.split(" ")[0]
+        match = self._close_match(clean_name, self._containing(first_word.lower()), 0.4)
+        if match:
+            return match, "brand"
+
+        # Global Fuzzy Match
+        match = self._close_match(clean_name, np.arange(len(self.names)), 0.7)
+        if match:
+            return match, "fuzzy"
+
+        # Substring Safety Net
+        match = self._first_contained_name(clean_name_lower)
+        if match:
+            return match, "substring"
+        return clean_name, "unmatched"
+
+    def match(self, extracted_name) -> tuple:
+        """
+        Cached _match on supplier_name_text(extracted_name), so any LLM value is accepted.
+        """
+        return self._cached_match(supplier_name_text(extracted_name))
+
+    def resolve(self, extracted_name) -> str:
+        return self.match(extracted_name)[0]
+
+
+# How a supplier name was resolved ("unknown" = no name given, "unmatched" = kept as written,
+# "mention" = the one supplier named in the text, filled in by validate_supplier_mention)
+MATCH_METHODS = ("exact", "brand", "fuzzy", "substring", "mention", "unmatched", "unknown")
+
+SUPPLIER_RESOLVER = SupplierResolver(SUPPLIER_LIST)
+
+
+def resolve_suppliers(names, resolver: SupplierResolver = SUPPLIER_RESOLVER) -> pd.DataFrame:
+    """
+    Bulk version of SupplierResolver.match for a whole column: each distinct
+    name (after supplier_name_text) is resolved once and mapped back to every
+    row. Returns a frame aligned with `names` with "Supplier Name",
+    "Supplier Match" and "Supplier Error" (None unless resolving that name raised).
+    """
+    index = names.index if isinstance(names, pd.Series) else None
+    texts = pd.Series([supplier_name_text(n) for n in names], index=index, dtype=object)
+    codes, uniques = pd.factorize(texts)
+
+    lookup = np.empty((len(uniques), 3), dtype=object)
+    for i, name in enumerate(uniques):
+        try:
+            lookup[i] = (*resolver.match(name), None)
+        except Exception as e:
+            lookup[i] = (name, "unmatched", str(e))
+    return pd.DataFrame(lookup[codes], index=texts.index, columns=["Supplier Name", "Supplier Match", "Supplier Error"])
@@ -0,0 +1,168 @@
+"""
+Compiled taxonomy: the one source of truth for valid classifications.
+
+data/taxonomy.TAXONOMY_STR is the hand-edited tree (segment -> general type ->
+specific type, each with a definition). It is parsed once into flat tables
+where a node's integer ID is its row, and the lookup structures are built from
+those tables:
+
+- segment -> frozenset of general types, (segment, general) -> frozenset of
+  specific types, plus the same children as ordered tuples (prompt order);
+- reverse maps: general -> segments, specific -> (segment, general) parents;
+- integer IDs for every segment, (segment, general) and full path.
+
+The tables are cached as TAXONOMY_CACHE_DIR/<sha256 of TAXONOMY_STR>.json, so
+any edit to the taxonomy text invalidates the cache.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from types import MappingProxyType
+
+from config import TAXONOMY_CACHE_DIR
+from data.taxonomy import TAXONOMY_STR
+
+TAXONOMY_FORMAT_VERSION = 1
+
+
+def taxonomy_fingerprint(taxonomy_str: str = TAXONOMY_STR) -> str:
+    digest = hashlib.sha256(taxonomy_str.encode("utf-8"))
+    digest.update(json.dumps([TAXONOMY_FORMAT_VERSION]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_taxonomy(taxonomy_str: str = TAXONOMY_STR) -> dict:
+    """
+    Flat tables from the taxonomy text; a node's ID is its row:
+    segments [name, definition], generals [segment_id, name, definition],
+    specifics [general_id, name, definition].
+    Raises ValueError on a malformed tree or a repeated name under one parent.
+    """
+    tree = json.loads(taxonomy_str)
+    segments, generals, specifics = [], [], []
+    for segment in tree:
+        segment_id = len(segments)
+        segments.append([segment["market_segment"], segment.get("definition", "")])
+        seen_generals = set()
+        for general in segment["system_types_general"]:
+            if general["name"] in seen_generals:
+                raise ValueError(f"Duplicate general type '{general['name']}' under '{segment['market_segment']}'")
+            seen_generals.add(general["name"])
+            general_id = len(generals)
+            generals.append([segment_id, general["name"], general.get("definition", "")])
+            seen_specifics = set()
+            for specific in general["system_types_specific"]:
+                if specific["name"] in seen_specifics:
+                    raise ValueError(f"Duplicate specific type '{specific['name']}' under '{general['name']}'")
+                seen_specifics.add(specific["name"])
+                specifics.append([general_id, specific["name"], specific.get("definition", "")])
+
+    if len({name for name, _ in segments}) != len(segments):
+        raise ValueError("Duplicate market segment in taxonomy")
+    return {"segments": segments, "generals": generals, "specifics": specifics}
+
+
+class TaxonomyModel:
+    """
+    Read-only lookups over the parsed tables. Every membership test is a
+    dict/frozenset lookup.
+    """
+
+    def __init__(self, tables: dict, version: str = ""):
+        self.version = version
+        segments, generals, specifics = tables["segments"], tables["generals"], tables["specifics"]
+
+        self.segments = tuple(name for name, _ in segments)
+        self.segment_ids = MappingProxyType({name: i for i, name in enumerate(self.segments)})
+
+        # Paths by ID: (segment, general) and (segment, general, specific)
+        self.general_paths = tuple((self.segments[seg_id], name) for seg_id, name, _ in generals)
+        self.specific_paths = tuple(self.general_paths[gen_id] + (name,) for gen_id, name, _ in specifics)
+        self.general_ids = MappingProxyType({path: i for i, path in enumerate(self.general_paths)})
+        self.specific_ids = MappingProxyType({path: i for i, path in enumerate(self.specific_paths)})
+
+        general_order = {segment: [] for segment in self.segments}
+        for segment, general in self.general_paths:
+            general_order[segment].append(general)
+        specific_order = {path: [] for path in self.general_paths}
+        for segment, general, specific in self.specific_paths:
+            specific_order[(segment, general)].append(specific)
+
+        self.general_order = MappingProxyType({k: tuple(v) for k, v in general_order.items()})
+        self.specific_order = MappingProxyType({k: tuple(v) for k, v in specific_order.items()})
+        self.general_by_segment = MappingProxyType({k: frozenset(v) for k, v in general_order.items()})
+        self.specific_by_general = MappingProxyType({k: frozenset(v) for k, v in specific_order.items()})
+
+        # Reverse maps
+        segments_by_general, parents_by_specific = {}, {}
+        for segment, general in self.general_paths:
+            segments_by_general.setdefault(general, set()).add(segment)
+        for segment, general, specific in self.specific_paths:
+            parents_by_specific.setdefault(specific, set()).add((segment, general))
+        self.segments_by_general = MappingProxyType({k: frozenset(v) for k, v in segments_by_general.items()})
+        self.parents_by_specific = MappingProxyType({k: frozenset(v) for k, v in parents_by_specific.items()})
+
+        # Definitions keyed by path: (segment,), (segment, general), (segment, general, specific)
+        definitions = {(name,): definition for name, definition in segments}
+        definitions.update({self.general_paths[i]: row[2] for i, row in enumerate(generals)})
+        definitions.update({self.specific_paths[i]: row[2] for i, row in enumerate(specifics)})
+        self.definitions = MappingProxyType(definitions)
+
+        self.general_names = frozenset(segments_by_general)
+        self.specific_names = frozenset(parents_by_specific)
+
+    def is_valid(self, segment: str, general: str = None, specific: str = None) -> bool:
+        """
+        Whether the (partial) path exists; omitted levels are not checked.
+        """
+        if general is None:
+            return segment in self.segment_ids
+        if specific is None:
+            return (segment, general) in self.general_ids
+        return (segment, general, specific) in self.specific_ids
+
+    def generals(self, segment: str) -> tuple:
+        return self.general_order.get(segment, ())
+
+    def specifics(self, segment: str, general: str) -> tuple:
+        return self.specific_order.get((segment, general), ())
+
+    def path_id(self, segment: str, general: str, specific: str):
+        """
+        Integer ID of a full classification path, or None if it is not in the taxonomy.
+        """
+        return self.specific_ids.get((segment, general, specific))
+
+
+def load_taxonomy(taxonomy_str: str = TAXONOMY_STR, cache_dir: str = TAXONOMY_CACHE_DIR) -> TaxonomyModel:
+    """
+    TaxonomyModel for `taxonomy_str`, from the cached tables when the content
+    hash matches, otherwise parsed and cached for the next start.
+    """
+    version = taxonomy_fingerprint(taxonomy_str)
+    cache_path = os.path.join(cache_dir, f"{version[:32]}.json")
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return TaxonomyModel(json.load(f), version)
+        except Exception as e:
+            print(f"⚠️ Taxonomy cache '{cache_path}' unreadable, re-parsing: {e}")
+
+    tables = parse_taxonomy(taxonomy_str)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(tables, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache taxonomy (continuing in memory): {e}")
+    return TaxonomyModel(tables, version)
+
+
+TAXONOMY = load_taxonomy()
+
+# Segment -> valid general types, in taxonomy order (formerly hand-maintained in data/taxonomy.py)
+VALID_DEPENDENCIES = MappingProxyType({segment: TAXONOMY.generals(segment) for segment in TAXONOMY.segments})
@@ -1,5 +1,6 @@
 import re
-from data.taxonomy import VALID_DEPENDENCIES
+from src.taxonomy_model import TAXONOMY
+from src.suppliers import SUPPLIER_SCANNER
 
 
 def _init_validation(result: dict):
@@ -43,7 +44,7 @@ def _compute_validation_score(result: dict):
 # ==========================================================
 def validate_market_system(result: dict) -> dict:
     """
-    Ensures the classification (Market Segment -> System General)
+    Ensures the classification (Market Segment -> System General -> System Specific)
     exists in the defined Taxonomy.
     Also records validation results.
     """
@@ -52,7 +53,7 @@ def validate_market_system(result: dict) -> dict:
     sts = result.get("System Type (Specific)", "Not Applicable")
 
     # 1. Validate Market Segment exists
-    if ms not in VALID_DEPENDENCIES:
+    if not TAXONOMY.is_valid(ms):
         # mark fail
         result = _add_check(
             result,
@@ -85,7 +86,7 @@ def validate_market_system(result: dict) -> dict:
     result = _add_check(result, "Market Segment", True)
 
     # 2. Validate System General under Market Segment
-    if stg not in VALID_DEPENDENCIES[ms]:
+    if not TAXONOMY.is_valid(ms, stg):
         # fail check
         result = _add_check(
             result,
@@ -108,8 +109,7 @@ def validate_market_system(result: dict) -> dict:
     # STG valid
     result = _add_check(result, "System Type (General)", True)
 
-    # STS (Specific) is not strictly validated in your taxonomy dict right now
-    # We'll mark it pass if it is not empty/unknown
+    # 3. Validate System Specific under System General
     if sts in ["", None, "Unknown"]:
         result = _add_check(
             result,
@@ -117,6 +117,17 @@ def validate_market_system(result: dict) -> dict:
             False,
             "System Type (Specific) missing/Unknown."
         )
+    elif not TAXONOMY.is_valid(ms, stg, sts):
+        result = _add_check(
+            result,
+            "System Type (Specific)",
+            False,
+            f"'{sts}' is not valid under System Type (General) '{stg}', "
+            "so System Type (Specific) forced to Not Applicable."
+        )
+
+        # auto-fix
+        result["System Type (Specific)"] = "Not Applicable"
     else:
         result = _add_check(result, "System Type (Specific)", True)
 
@@ -232,6 +243,35 @@ def validate_mro(result: dict) -> dict:
     return result
 
 
+def validate_supplier_mention(result: dict, description: str) -> dict:
+    """
+    Cross-checks Supplier Name against the suppliers the paragraph names
+    (SupplierScanner). An unresolved answer is replaced when the text names
+    exactly one supplier; otherwise the check is only recorded.
+    Paragraphs naming no taxonomy supplier are not checked.
+    """
+    mentioned = SUPPLIER_SCANNER.mentioned_suppliers(description)
+    if not mentioned:
+        return result
+
+    supplier = result.get("Supplier Name", "Unknown")
+    if result.get("Supplier Match") in ["unknown", "unmatched"] and len(mentioned) == 1:
+        # auto-fix
+        result["Supplier Name"], result["Supplier Match"] = mentioned[0], "mention"
+        result = _add_check(result, "Supplier Name", True)
+    elif supplier in mentioned:
+        result = _add_check(result, "Supplier Name", True)
+    else:
+        result = _add_check(
+            result,
+            "Supplier Name",
+            False,
+            f"Supplier '{supplier}' is not among the suppliers named in the text: {', '.join(mentioned)}."
+        )
+
+    return result
+
+
 # ==========================================================
 # MASTER VALIDATION PIPELINE
 # ==========================================================
@@ -253,9 +293,11 @@ def run_all_validations(result: dict, description: str) -> dict:
     result = validate_program_quantity(result)
     result = validate_mro(result)
 
+    # 4. Cross-check Supplier against the text
+    result = validate_supplier_mention(result, description)
+
     # ✅ You can add more validations here later, ex:
     # - Customer Country not Unknown
-    # - Supplier Name not Unknown
     # - Value numeric
     # - Currency present, etc.
 
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from src import evaluation
+from src.rate_limiter import RateLimiter, get_rate_limiter
+
+
+def test_rate_limiter_counts_requests_let_through():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10000)
+    for _ in range(3):
+        limiter.acquire(10)
+    assert limiter.sent == 3
+
+
+def test_requests_per_row_reports_requests_actually_sent(monkeypatch):
+    # one_shot: one request per row; four_call: two rows retry once, one skips the geography prompt
+    sent_per_row = {"one_shot": [1, 1, 1, 1], "four_call": [4, 5, 3, 5]}
+
+    def fake_classify_records(rows, max_concurrency, mode):
+        for n in sent_per_row[mode]:
+            for _ in range(n):
+                get_rate_limiter().acquire(1)
+        return [{} for _ in rows]
+
+    monkeypatch.setattr(evaluation, "classify_records", fake_classify_records)
+    df = pd.DataFrame({"Description of Contract": [f"Contract {i} for radar spares." for i in range(4)]})
+
+    cost = evaluation.compare_extraction_modes(df)["cost"].set_index("Mode")
+    assert cost.loc["four_call", "Requests / Row"] == 4.25
+    assert cost.loc["one_shot", "Requests / Row"] == 1.0
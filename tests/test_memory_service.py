@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import memory_service
+from src.memory_service import MemoryService
+
+WORKBOOK_ROWS = [
+    ("Lockheed Martin was awarded a contract for F-35 sustainment.", "Air Platforms"),
+    ("Raytheon received a contract for Patriot radar spares.", "C4ISR"),
+    ("General Dynamics was awarded a contract for Virginia-class submarine work.", "Naval Platforms"),
+]
+
+
+def _write_workbook(path, rows):
+    pd.DataFrame(rows, columns=["Description of Contract", "Market Segment"]).to_excel(path, index=False)
+
+
+def _texts(snapshot):
+    texts = [snapshot.examples.text(i) for i in range(snapshot.n_base)]
+    if snapshot.tail_examples is not None:
+        texts += [snapshot.tail_examples.text(i) for i in range(snapshot.n_tail)]
+    return texts
+
+
+@pytest.fixture
+def service_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_service, "MEMORY_REWEIGHT_EVERY", 2)
+    workbook = tmp_path / "memory.xlsx"
+    _write_workbook(workbook, WORKBOOK_ROWS)
+
+    def make():
+        return MemoryService(str(workbook), watch_seconds=0, wal_path=str(tmp_path / "wal.jsonl"),
+                             index_root=str(tmp_path / "index"), archive_path=str(tmp_path / "folded.jsonl"))
+    return workbook, make
+
+
+def _add_and_reweight(service, records):
+    assert service.add_contracts(records) == len(records)
+    service._reweight_thread.join()
+
+
+def test_added_rows_survive_reweight_and_restart(service_factory):
+    _, make = service_factory
+    service = make()
+    reviewed = [{"Description of Contract": f"Zorblax widget lot {i} for the Navy", "Market Segment": "Naval Platforms"}
+                for i in range(2)]
+    _add_and_reweight(service, reviewed)
+
+    snapshot = service.snapshot()
+    assert snapshot.n_base == len(WORKBOOK_ROWS) + 2 and snapshot.n_tail == 0
+
+    restarted = make().snapshot()
+    assert restarted.n_base == len(WORKBOOK_ROWS) + 2 and restarted.n_tail == 0
+    assert {r["Description of Contract"] for r in reviewed} <= set(_texts(restarted))
+
+
+def test_folded_rows_carry_over_to_a_new_workbook(service_factory):
+    workbook, make = service_factory
+    service = make()
+    reviewed = [{"Description of Contract": f"Zorblax widget lot {i} for the Navy", "Market Segment": "Naval Platforms"}
+                for i in range(2)]
+    _add_and_reweight(service, reviewed)
+    late = {"Description of Contract": "Late Zorblax addition", "Market Segment": "Naval Platforms"}
+    service.add_contracts([late])
+
+    _write_workbook(workbook, WORKBOOK_ROWS[:2] + [("BAE Systems was awarded a contract for CV90 vehicles.", "Land Vehicles")])
+    service.refresh(wait=True)
+
+    texts = _texts(service.snapshot())
+    for record in reviewed + [late]:
+        assert texts.count(record["Description of Contract"]) == 1
+
+    # The same holds for a fresh process on the new workbook
+    assert set(r["Description of Contract"] for r in reviewed + [late]) <= set(_texts(make().snapshot()))
+
+
+def test_rows_already_in_the_new_workbook_are_not_replayed(service_factory):
+    workbook, make = service_factory
+    service = make()
+    reviewed = [{"Description of Contract": f"Zorblax widget lot {i} for the Navy", "Market Segment": "Naval Platforms"}
+                for i in range(2)]
+    _add_and_reweight(service, reviewed)
+
+    # The analyst wrote the reviewed rows back into the workbook
+    _write_workbook(workbook, WORKBOOK_ROWS + [(r["Description of Contract"], r["Market Segment"]) for r in reviewed])
+    service.refresh(wait=True)
+
+    snapshot = service.snapshot()
+    assert snapshot.n_base == len(WORKBOOK_ROWS) + 2 and snapshot.n_tail == 0
+
+
+EMBEDDED_DIR = os.path.join(os.path.dirname(__file__), "..", "db_storage")
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(EMBEDDED_DIR, "chroma.sqlite3")), reason="no persisted Chroma collection")
+def test_search_embedded_serves_the_persisted_collection(tmp_path):
+    service = MemoryService(str(tmp_path / "unused.xlsx"), watch_seconds=0, embedded_dir=EMBEDDED_DIR)
+    collection = service.embedded_collection()
+    assert collection is not None and len(collection) > 0
+
+    hits = service.search_embedded(collection.vectors[3], k=2)
+    assert hits[0]["text"] == collection.documents[3]
+    assert hits[0]["score"] == pytest.approx(1.0, abs=1e-4)
+    assert set(hits[0]["classification"]) >= {"Market Segment", "System Type (General)"}
+
+
+def test_search_embedded_without_a_collection_returns_nothing(tmp_path):
+    service = MemoryService(str(tmp_path / "unused.xlsx"), watch_seconds=0, embedded_dir=str(tmp_path / "missing"))
+    assert service.embedded_collection() is None
+    assert service.search_embedded(np.ones(4)) == []
@@ -0,0 +1,45 @@
+import pytest
+
+from src.evaluation import _stage_requests, static_prompt_prefixes, check_prompt_prefix_stability
+
+RECORDS = [
+    ("Lockheed Martin Corp., Fort Worth, Texas, was awarded a $1,200,000,000 modification "
+     "for F-35 Lightning II sustainment for the U.S. Air Force."),
+    ("BAE Systems Hagglunds AB, Ornskoldsvik, Sweden, received a SEK 2.1 billion order "
+     "for CV90 infantry fighting vehicles for the Netherlands."),
+]
+SIMILAR_CASE = {"text": "Raytheon received a contract for Patriot radar spares.",
+                "classification": {"Market Segment": "C4ISR"}}
+
+
+@pytest.fixture(scope="module")
+def prefixes():
+    return static_prompt_prefixes()
+
+
+def test_every_stage_has_a_non_empty_static_prefix(prefixes):
+    for stage, (system, prefix) in prefixes.items():
+        assert system, f"{stage}: empty system message"
+        assert prefix, f"{stage}: prompt has no static prefix"
+
+
+@pytest.mark.parametrize("similar_cases", [SIMILAR_CASE, None])
+def test_two_records_share_system_message_and_prompt_prefix_bytes(prefixes, similar_cases):
+    first, second = (
+        _stage_requests(text, similar_cases, {"Customer Country": country, "Supplier Country": country})
+        for text, country in zip(RECORDS, ["USA", "Sweden"])
+    )
+    for stage, (system, prefix) in prefixes.items():
+        (prompt_a, system_a), (prompt_b, system_b) = first[stage], second[stage]
+        assert system_a.encode() == system_b.encode() == system.encode(), f"{stage}: system message differs"
+
+        prefix_bytes = prefix.encode()
+        assert prompt_a.encode()[:len(prefix_bytes)] == prefix_bytes, f"{stage}: prefix broken for record 1"
+        assert prompt_b.encode()[:len(prefix_bytes)] == prefix_bytes, f"{stage}: prefix broken for record 2"
+        assert prompt_a != prompt_b, f"{stage}: record text missing from the prompt"
+
+
+def test_stability_check_passes_on_real_rows():
+    report = check_prompt_prefix_stability(RECORDS)
+    assert set(report["Stage"]) == set(static_prompt_prefixes())
+    assert (report["Cacheable Share"] > 0).all()
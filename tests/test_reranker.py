@@ -0,0 +1,26 @@
+import pytest
+
+from src.reranker import CrossEncoderReranker
+
+
+def test_batches_respect_the_padded_token_budget():
+    reranker = CrossEncoderReranker(batch_tokens=100, max_batch=3)
+    lengths = [40, 10, 30, 20, 10, 50]
+
+    batches = reranker._batches(lengths)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[i] for i in batch) <= 100
+    # shortest pairs first
+    assert [lengths[i] for i in batches[0]] == [10, 10, 20]
+
+
+def test_missing_model_reports_unavailable(tmp_path):
+    reranker = CrossEncoderReranker(model_dir=str(tmp_path))
+
+    assert not reranker.available
+    assert reranker.unavailable_reason
+    with pytest.raises(RuntimeError):
+        reranker.score("query", ["text"])
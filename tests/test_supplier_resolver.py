@@ -0,0 +1,20 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.evaluation import supplier_golden_set, supplier_resolver_check
+
+WORKBOOK = os.path.join(os.path.dirname(__file__), "..", "Market Segment.xlsx")
+
+
+@pytest.fixture(scope="module")
+def golden_names():
+    df = pd.read_excel(WORKBOOK) if os.path.exists(WORKBOOK) else None
+    return supplier_golden_set(df)
+
+
+def test_resolver_matches_legacy_matcher_on_golden_set(golden_names):
+    report = supplier_resolver_check(golden_names)
+    assert report["names"] > 0
+    assert report["mismatches"] == [], f"{len(report['mismatches'])} names resolve differently: {report['mismatches'][:5]}"